@@ -0,0 +1,109 @@
+"""handle_negative_values Micro-Benchmark.
+
+This script:
+1. Builds synthetic merged-style frames from 10k to 10M rows.
+2. Times the vectorized handle_negative_values against the previous per-cell implementation.
+3. Prints how run time scales with the number of rows.
+
+Usage:
+    python benchmarks/bench_handle_negative_values.py [--legacy-max-rows N]
+
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Make the pipeline modules in scripts/ importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from data_processing import handle_negative_values  # noqa: E402
+
+ROW_COUNTS = [10_000, 100_000, 1_000_000, 10_000_000]
+
+def legacy_handle_negative_values(df: pd.DataFrame) -> pd.DataFrame:
+    """Previous implementation, calling a Python function once per cell.
+
+    Args:
+        df (pd.DataFrame): The dataset.
+
+    Returns:
+        pd.DataFrame: The dataset with no negative values.
+    """
+    numeric_cols = df.select_dtypes(include=["number"]).columns
+    df[numeric_cols] = df[numeric_cols].apply(lambda col: col.map(lambda x: np.nan if x < 0 else x))
+
+    return df
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Builds a frame shaped like the merged Fitbit data, with about 1% negative values.
+
+    Args:
+        rows (int): Number of rows.
+        seed (int): Random seed.
+
+    Returns:
+        pd.DataFrame: Synthetic dataset.
+    """
+    rng = np.random.default_rng(seed)
+
+    df = pd.DataFrame({
+        "Id": rng.integers(1_000_000_000, 9_999_999_999, rows),
+        "Date": "2016-04-12",
+        "TotalSteps": rng.integers(-100, 20_000, rows),
+        "TotalDistance": rng.normal(5, 3, rows),
+        "VeryActiveMinutes": rng.integers(0, 120, rows),
+        "Calories": rng.integers(-20, 4_000, rows),
+        "TotalMinutesAsleep": rng.normal(400, 100, rows),
+        "AvgHeartRate": rng.normal(80, 12, rows),
+        "SleepEfficiency": rng.random(rows),
+    })
+
+    return df
+
+def time_call(func, df: pd.DataFrame) -> float:
+    """Times a single call on a fresh copy of the frame.
+
+    Args:
+        func: Function taking and returning a DataFrame.
+        df (pd.DataFrame): Input dataset.
+
+    Returns:
+        float: Elapsed seconds.
+    """
+    data = df.copy()
+    start = time.perf_counter()
+    func(data)
+
+    return time.perf_counter() - start
+
+def main() -> None:
+    """Runs the benchmark and prints one line per row count."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--legacy-max-rows", type=int, default=1_000_000,
+                        help="Largest row count the slow per-cell implementation is timed at.")
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'vectorized (s)':>16} {'per-cell (s)':>14} {'speedup':>9}")
+
+    for rows in ROW_COUNTS:
+        df = make_frame(rows)
+
+        # Both implementations must agree before timing them
+        if rows <= args.legacy_max_rows:
+            expected = legacy_handle_negative_values(df.copy())
+            pd.testing.assert_frame_equal(handle_negative_values(df.copy()), expected, check_dtype=False)
+
+        vectorized = time_call(handle_negative_values, df)
+
+        if rows <= args.legacy_max_rows:
+            legacy = time_call(legacy_handle_negative_values, df)
+            print(f"{rows:>12,} {vectorized:>16.4f} {legacy:>14.4f} {legacy / vectorized:>8.1f}x")
+        else:
+            print(f"{rows:>12,} {vectorized:>16.4f} {'skipped':>14} {'-':>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Minute Sleep Rollup Benchmark.
+
+This script:
+1. Loads and standardizes the minuteSleep_merged inputs from data/raw.
+2. Scales them up (100x by default) by replicating every user under new Ids.
+3. Times the single-pass bincount rollup against the previous two-groupby implementation.
+
+Usage:
+    python benchmarks/bench_minute_sleep_rollup.py [--scale N] [--repeat N]
+
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+import pandas as pd
+
+# Make the pipeline modules in scripts/ importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from data_processing import load_data, rollup_minute_sleep, standardize_date_format  # noqa: E402
+
+def legacy_minute_sleep_rollup(df_minute_sleep: pd.DataFrame) -> pd.DataFrame:
+    """Previous implementation: two groupby size passes joined by a merge.
+
+    Args:
+        df_minute_sleep (pd.DataFrame): Minute-level sleep data.
+
+    Returns:
+        pd.DataFrame: Daily 'TotalMinutesAsleep' and 'TotalTimeInBed' per user.
+    """
+    df_minute_sleep = df_minute_sleep.copy()
+    date_col = df_minute_sleep.columns[1]
+
+    df_minute_sleep.drop(columns=["logId"], inplace=True, errors="ignore")
+
+    sleep_summary = df_minute_sleep.groupby(["Id", date_col], as_index=False).size()
+    sleep_summary.rename(columns={"size": "TotalTimeInBed"}, inplace=True)
+
+    asleep_summary = df_minute_sleep[df_minute_sleep["value"] == 1].groupby(["Id", date_col], as_index=False).size()
+    asleep_summary.rename(columns={"size": "TotalMinutesAsleep"}, inplace=True)
+
+    sleep_summary = sleep_summary.merge(asleep_summary, on=["Id", date_col], how="left")
+    sleep_summary.fillna(0, inplace=True)
+
+    return sleep_summary[["Id", date_col, "TotalMinutesAsleep", "TotalTimeInBed"]]
+
+def load_minute_sleep(scale: int) -> pd.DataFrame:
+    """Loads all minuteSleep inputs and replicates them under new Ids.
+
+    Args:
+        scale (int): Number of copies of the data.
+
+    Returns:
+        pd.DataFrame: Standardized minute-level sleep data.
+    """
+    dfs = load_data()
+    standardize_date_format(dfs)
+
+    base = pd.concat([df for key, df in dfs.items() if key.startswith("minuteSleep_merged")], ignore_index=True)
+
+    # Shift Ids past the largest real Id so every copy is a distinct set of users
+    id_offset = int(base["Id"].max()) + 1
+    copies = [base.assign(Id=base["Id"] + copy * id_offset) for copy in range(scale)]
+
+    return pd.concat(copies, ignore_index=True)
+
+def best_time(func, df: pd.DataFrame, repeat: int) -> float:
+    """Returns the best wall time of several calls.
+
+    Args:
+        func: Function taking a DataFrame.
+        df (pd.DataFrame): Input dataset.
+        repeat (int): Number of timed calls.
+
+    Returns:
+        float: Fastest elapsed seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+def main() -> None:
+    """Runs the benchmark and prints the timings."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=100, help="Number of copies of the minuteSleep inputs.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed calls per implementation.")
+    args = parser.parse_args()
+
+    df = load_minute_sleep(args.scale)
+
+    # Both implementations must produce the same sleep totals
+    expected = legacy_minute_sleep_rollup(df)
+    result = rollup_minute_sleep(df)[expected.columns]
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    legacy = best_time(legacy_minute_sleep_rollup, df, args.repeat)
+    bincount = best_time(rollup_minute_sleep, df, args.repeat)
+
+    print(f"rows: {len(df):,}  user-days: {len(result):,}")
+    print(f"two groupbys + merge: {legacy:.4f}s")
+    print(f"single-pass bincount: {bincount:.4f}s ({legacy / bincount:.1f}x faster, "
+          f"also counts restless and awake minutes)")
+
+if __name__ == "__main__":
+    main()
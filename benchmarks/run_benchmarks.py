@@ -0,0 +1,294 @@
+"""Pipeline Stage Benchmark Suite.
+
+This script:
+1. Generates (once, then reuses) synthetic Fitabase exports at several scale tiers.
+2. Runs every stage of handle_data_processing separately: load_data, standardize_date_format,
+   convert_time_data_to_daily, merge_all_data and each step of clean_data.
+3. Records wall time, peak traced memory and output rows per stage.
+4. Writes the results as JSON, and compares two result files to spot regressions between commits.
+
+Usage:
+    python benchmarks/run_benchmarks.py --tiers small medium [--repeat 3] [--use-schemas ...]
+    python benchmarks/run_benchmarks.py --compare OLD.json NEW.json
+
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+import pandas as pd
+
+# Make the pipeline modules in scripts/ importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import data_processing  # noqa: E402
+from synthetic_data import write_synthetic_dataset  # noqa: E402
+
+# Constants
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+
+# Generated datasets, reused across runs
+DATA_DIR = BENCHMARK_DIR / "data"
+
+# JSON results, one file per run
+RESULTS_DIR = BENCHMARK_DIR / "results"
+
+# Scale tiers: users, days per period and heart rate readings per tracking user per day
+TIERS = {
+    "tiny": {"users": 100, "days": 31, "heartrate_samples": 288},
+    "small": {"users": 1_000, "days": 31, "heartrate_samples": 288},
+    "medium": {"users": 10_000, "days": 31, "heartrate_samples": 96},
+    "large": {"users": 100_000, "days": 31, "heartrate_samples": 24},
+}
+
+# Slowdown above which --compare flags a stage as a regression
+REGRESSION_THRESHOLD = 1.10
+
+def get_commit() -> str:
+    """Returns the current git commit hash, or 'unknown' outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARK_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def prepare_tier(tier: str, seed: int) -> Path:
+    """Generates the synthetic dataset for a tier unless it already exists.
+
+    Args:
+        tier (str): Tier name from TIERS.
+        seed (int): Random seed.
+
+    Returns:
+        Path: Raw data directory of the tier.
+    """
+    params = TIERS[tier]
+    raw_dir = DATA_DIR / f"{tier}_seed{seed}"
+    marker = raw_dir / "params.json"
+
+    if marker.exists() and json.loads(marker.read_text()) == params:
+        return raw_dir
+
+    write_synthetic_dataset(raw_dir, params["users"], params["days"], params["heartrate_samples"], seed)
+    marker.write_text(json.dumps(params))
+
+    return raw_dir
+
+def count_rows(result) -> int:
+    """Counts the rows produced by a stage (a DataFrame or a dict of DataFrames)."""
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+
+    if isinstance(result, dict):
+        return sum(len(df) for df in result.values())
+
+    return 0
+
+def measure(func: Callable, track_memory: bool) -> Tuple[object, float, int]:
+    """Runs a function once, timing it and recording its peak traced memory.
+
+    Args:
+        func (Callable): Zero-argument function to run.
+        track_memory (bool): If True, record peak memory with tracemalloc.
+
+    Returns:
+        tuple: (result, elapsed seconds, peak bytes allocated during the call or -1)
+    """
+    if track_memory:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+
+    peak = -1
+    if track_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return result, elapsed, peak
+
+def run_pipeline_stages(raw_dir: Path, options: dict, track_memory: bool) -> List[dict]:
+    """Runs every pipeline stage once on a dataset, measuring each separately.
+
+    Each stage receives the previous stage's output, exactly as handle_data_processing
+    chains them.
+
+    Args:
+        raw_dir (Path): Raw data directory.
+        options (dict): Pipeline options (stream_heartrate, use_schemas, ...).
+        track_memory (bool): If True, record peak memory per stage.
+
+    Returns:
+        List[dict]: One record per stage.
+    """
+    records = []
+
+    def record(stage: str, func: Callable):
+        result, seconds, peak = measure(func, track_memory)
+        records.append({"stage": stage, "seconds": seconds, "peak_bytes": peak, "rows_out": count_rows(result)})
+        return result
+
+    dfs = record("load_data", lambda: data_processing.load_data(
+        stream_heartrate=options["stream_heartrate"], max_workers=options["max_workers"],
+        use_schemas=options["use_schemas"], raw_data_dir=raw_dir))
+
+    def standardize():
+        data_processing.standardize_date_format(dfs, keep_datetime=options["keep_datetime"])
+        return dfs
+
+    def convert():
+        data_processing.convert_time_data_to_daily(dfs, max_workers=options["max_workers"])
+        return dfs
+
+    record("standardize_date_format", standardize)
+    record("convert_time_data_to_daily", convert)
+
+    df = record("merge_all_data", lambda: data_processing.merge_all_data(
+        dfs, use_sorted_merge=options["use_sorted_merge"]))
+
+    for step in data_processing.CLEANING_STEPS:
+        df = record(f"clean_data.{step.__name__}", lambda step=step, df=df: step(df))
+
+    return records
+
+def run_tier(tier: str, seed: int, options: dict, repeat: int, track_memory: bool) -> dict:
+    """Benchmarks one tier, keeping the fastest time of several runs per stage.
+
+    Args:
+        tier (str): Tier name.
+        seed (int): Random seed of the dataset.
+        options (dict): Pipeline options.
+        repeat (int): Number of full runs.
+        track_memory (bool): If True, record peak memory in one extra, untimed run.
+
+    Returns:
+        dict: Tier parameters and per-stage results.
+    """
+    raw_dir = prepare_tier(tier, seed)
+    runs = [run_pipeline_stages(raw_dir, options, track_memory=False) for _ in range(repeat)]
+
+    # tracemalloc slows Python-level allocations, so memory gets its own untimed run
+    memory_run = run_pipeline_stages(raw_dir, options, track_memory=True) if track_memory else None
+
+    stages = []
+    for position, stage_runs in enumerate(zip(*runs)):
+        best = min(stage_runs, key=lambda item: item["seconds"])
+        peak = memory_run[position]["peak_bytes"] if memory_run else -1
+        stages.append({**best, "peak_bytes": peak})
+
+    return {**TIERS[tier], "seed": seed, "stages": stages}
+
+def print_results(results: dict) -> None:
+    """Prints a per-stage table for every benchmarked tier."""
+    for tier, tier_results in results["tiers"].items():
+        print(f"\n{tier} ({tier_results['users']:,} users)")
+        print(f"{'stage':<42} {'seconds':>10} {'peak MB':>10} {'rows out':>12}")
+
+        for stage in tier_results["stages"]:
+            peak_mb = stage["peak_bytes"] / 1024 ** 2 if stage["peak_bytes"] >= 0 else float("nan")
+            print(f"{stage['stage']:<42} {stage['seconds']:>10.4f} {peak_mb:>10.1f} {stage['rows_out']:>12,}")
+
+        total = sum(stage["seconds"] for stage in tier_results["stages"])
+        print(f"{'total':<42} {total:>10.4f}")
+
+def compare_results(old_file: Path, new_file: Path) -> bool:
+    """Prints per-stage time and memory ratios between two result files.
+
+    Args:
+        old_file (Path): Baseline results.
+        new_file (Path): Results to compare against the baseline.
+
+    Returns:
+        bool: True if any stage is slower than REGRESSION_THRESHOLD allows.
+    """
+    old = json.loads(old_file.read_text())
+    new = json.loads(new_file.read_text())
+    regressed = False
+
+    print(f"{old['commit']} -> {new['commit']}")
+
+    for tier in sorted(set(old["tiers"]) & set(new["tiers"])):
+        print(f"\n{tier}")
+        print(f"{'stage':<42} {'old s':>9} {'new s':>9} {'time':>7} {'memory':>7}")
+
+        old_stages: Dict[str, dict] = {stage["stage"]: stage for stage in old["tiers"][tier]["stages"]}
+
+        for stage in new["tiers"][tier]["stages"]:
+            before = old_stages.get(stage["stage"])
+            if before is None:
+                continue
+
+            time_ratio = stage["seconds"] / before["seconds"] if before["seconds"] > 0 else float("nan")
+            memory_ratio = (stage["peak_bytes"] / before["peak_bytes"]
+                            if before["peak_bytes"] > 0 and stage["peak_bytes"] >= 0 else float("nan"))
+
+            flag = ""
+            if time_ratio > REGRESSION_THRESHOLD:
+                flag = "  <- slower"
+                regressed = True
+
+            print(f"{stage['stage']:<42} {before['seconds']:>9.4f} {stage['seconds']:>9.4f} "
+                  f"{time_ratio:>6.2f}x {memory_ratio:>6.2f}x{flag}")
+
+    return regressed
+
+def main() -> None:
+    """Parses command-line arguments and runs or compares benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tiers", nargs="+", choices=list(TIERS), default=["tiny", "small"])
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated datasets.")
+    parser.add_argument("--repeat", type=int, default=1, help="Full runs per tier; the fastest time is kept.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip peak memory tracking (faster).")
+    parser.add_argument("--output", type=Path, help="Results file (default: results/<time>_<commit>.json).")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("OLD", "NEW"),
+                        help="Compare two results files instead of running benchmarks.")
+    parser.add_argument("--stream-heartrate", action="store_true")
+    parser.add_argument("--use-schemas", action="store_true")
+    parser.add_argument("--use-sorted-merge", action="store_true")
+    parser.add_argument("--keep-datetime", action="store_true")
+    parser.add_argument("--max-workers", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare_results(*args.compare) else 0)
+
+    options = {
+        "stream_heartrate": args.stream_heartrate,
+        "use_schemas": args.use_schemas,
+        "use_sorted_merge": args.use_sorted_merge,
+        "keep_datetime": args.keep_datetime,
+        "max_workers": args.max_workers,
+    }
+
+    commit = get_commit()
+    started = datetime.now(timezone.utc)
+
+    results = {
+        "commit": commit,
+        "timestamp": started.isoformat(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "options": options,
+        "tiers": {tier: run_tier(tier, args.seed, options, args.repeat, not args.no_memory) for tier in args.tiers},
+    }
+
+    print_results(results)
+
+    output = args.output or RESULTS_DIR / f"{started:%Y%m%dT%H%M%S}_{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""Fitbit Pipeline Checkpointing Script.
+
+This script:
+1. Runs the data processing pipeline as named stages: load, standardize, convert, merge and clean.
+2. Saves each stage's output as Parquet, with a manifest holding a hash of the stage's inputs.
+3. Skips every leading stage whose inputs are unchanged, loading only the last valid checkpoint.
+4. Resumes a run from any stage on request, reusing the checkpoint of the stage before it.
+5. Exports the pre-cleaned and cleaned datasets as CSV.
+
+A stage's input hash covers the raw files' contents (for load) or the previous stage's
+output hash, plus the options that change results. The raw files' content hashes are kept
+next to the checkpoints and only recomputed for files whose size or modification time
+changed, so an unchanged run does not read the raw data. Code changes are not tracked, so
+resume from the first edited stage after changing a step.
+
+"""
+
+import hashlib
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, Union
+import pandas as pd
+from data_cache import fingerprint_file, hash_file
+from data_processing import (
+    OUTPUT_FILE, PRE_CLEANED_FILE, PROCESSED_DATA_DIR, RAW_DATA_DIR, categorize_files, clean_data,
+    convert_time_data_to_daily, list_all_files, load_data, merge_all_data, standardize_date_format
+)
+from instrumentation import instrument_step
+
+# Constants
+
+# Directory holding one subfolder of Parquet files and a manifest per stage
+CHECKPOINT_DIR = PROCESSED_DATA_DIR / "checkpoints"
+
+# Pipeline stages, in order
+STAGES = ["load", "standardize", "convert", "merge", "clean"]
+
+# Options of handle_data_processing that change stage outputs (the rest only change speed)
+OUTPUT_OPTIONS = ["stream_heartrate", "use_schemas", "keep_datetime", "use_sorted_merge"]
+
+# File next to the stage folders holding the raw files' fingerprints of the last run
+RAW_FINGERPRINTS_FILE = "raw_fingerprints.json"
+
+StageData = Union[pd.DataFrame, Dict[str, pd.DataFrame]]
+
+def hash_text(text: str) -> str:
+    """Returns the SHA-256 hex digest of a string."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def fingerprint_raw_inputs(raw_data_dir: Path, checkpoint_dir: Path = CHECKPOINT_DIR) -> Dict[str, dict]:
+    """Fingerprints every raw file the pipeline loads, reusing the fingerprints of the last run.
+
+    Only files whose size or modification time changed are read and hashed again. The
+    fingerprints are saved next to the checkpoints for the next run.
+
+    Args:
+        raw_data_dir (Path): Directory holding the period folders.
+        checkpoint_dir (Path): Checkpoint directory.
+
+    Returns:
+        Dict[str, dict]: Fingerprint per file path, relative to raw_data_dir.
+    """
+    fingerprints_file = checkpoint_dir / RAW_FINGERPRINTS_FILE
+
+    try:
+        previous = json.loads(fingerprints_file.read_text())
+    except (OSError, ValueError):
+        previous = {}
+
+    # Fingerprints are only reusable for the same raw data directory
+    known = previous.get("files", {}) if previous.get("raw_data_dir") == str(raw_data_dir.resolve()) else {}
+
+    files_to_keep, _ = categorize_files(list_all_files(raw_data_dir))
+
+    fingerprints = {}
+    for file in files_to_keep:
+        name = str(file.relative_to(raw_data_dir))
+        fingerprints[name] = fingerprint_file(file, known.get(name))
+
+    if fingerprints != known:
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        fingerprints_file.write_text(json.dumps({"raw_data_dir": str(raw_data_dir.resolve()), "files": fingerprints},
+                                                indent=2, sort_keys=True))
+
+    return fingerprints
+
+def hash_raw_inputs(raw_data_dir: Path, options: dict, checkpoint_dir: Path = CHECKPOINT_DIR) -> str:
+    """Hashes the contents of every raw file the pipeline loads, plus the output options.
+
+    Args:
+        raw_data_dir (Path): Directory holding the period folders.
+        options (dict): Pipeline options.
+        checkpoint_dir (Path): Checkpoint directory holding the raw files' fingerprints.
+
+    Returns:
+        str: Input hash of the load stage.
+    """
+    fingerprints = fingerprint_raw_inputs(raw_data_dir, checkpoint_dir)
+
+    file_hashes = {name: fingerprint["sha256"] for name, fingerprint in fingerprints.items()}
+    relevant_options = {name: options.get(name, False) for name in OUTPUT_OPTIONS}
+
+    return hash_text(json.dumps({"files": file_hashes, "options": relevant_options}, sort_keys=True))
+
+def get_stage_input_hash(stage: str, previous_output_hash: str) -> str:
+    """Derives a stage's input hash from the output hash of the stage before it.
+
+    Args:
+        stage (str): Stage name.
+        previous_output_hash (str): Output hash of the previous stage.
+
+    Returns:
+        str: Input hash of the stage.
+    """
+    return hash_text(f"{stage}|{previous_output_hash}")
+
+def read_stage_manifest(stage: str, checkpoint_dir: Path = CHECKPOINT_DIR) -> Optional[dict]:
+    """Reads a stage's checkpoint manifest.
+
+    Args:
+        stage (str): Stage name.
+        checkpoint_dir (Path): Checkpoint directory.
+
+    Returns:
+        dict: The manifest, or None if the stage has no complete checkpoint.
+    """
+    try:
+        return json.loads((checkpoint_dir / stage / "manifest.json").read_text())
+    except (OSError, ValueError):
+        return None
+
+def write_checkpoint(stage: str, data: StageData, input_hash: str, checkpoint_dir: Path = CHECKPOINT_DIR) -> str:
+    """Saves a stage's output as Parquet files next to a manifest.
+
+    The manifest is written last, so an interrupted write never looks complete.
+
+    Args:
+        stage (str): Stage name.
+        data (StageData): The stage output (a DataFrame or a dict of DataFrames).
+        input_hash (str): Input hash of the stage.
+        checkpoint_dir (Path): Checkpoint directory.
+
+    Returns:
+        str: Output hash of the stage (a hash of the written files).
+    """
+    stage_dir = checkpoint_dir / stage
+    shutil.rmtree(stage_dir, ignore_errors=True)
+    stage_dir.mkdir(parents=True)
+
+    frames = data if isinstance(data, dict) else {"data": data}
+
+    file_hashes = {}
+    for name, df in frames.items():
+        file = stage_dir / f"{name}.parquet"
+        df.to_parquet(file)
+        file_hashes[name] = hash_file(file)
+
+    output_hash = hash_text(json.dumps(file_hashes, sort_keys=True))
+
+    manifest = {
+        "stage": stage,
+        "input_hash": input_hash,
+        "output_hash": output_hash,
+        "is_dict": isinstance(data, dict),
+        "frames": list(frames),
+    }
+    (stage_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+    return output_hash
+
+def read_checkpoint(stage: str, checkpoint_dir: Path = CHECKPOINT_DIR) -> StageData:
+    """Loads a stage's saved output.
+
+    Args:
+        stage (str): Stage name.
+        checkpoint_dir (Path): Checkpoint directory.
+
+    Returns:
+        StageData: The stage output (a DataFrame or a dict of DataFrames).
+    """
+    manifest = read_stage_manifest(stage, checkpoint_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No checkpoint found for stage '{stage}' in {checkpoint_dir}")
+
+    frames = {name: pd.read_parquet(checkpoint_dir / stage / f"{name}.parquet") for name in manifest["frames"]}
+
+    return frames if manifest["is_dict"] else frames["data"]
+
+def run_stage(stage: str, data: Optional[StageData], options: dict) -> StageData:
+    """Runs one pipeline stage.
+
+    Args:
+        stage (str): Stage name.
+        data (StageData): Output of the previous stage (None for load).
+        options (dict): Pipeline options, named as in handle_data_processing.
+
+    Returns:
+        StageData: The stage output.
+    """
+    if stage == "load":
+        return load_data(stream_heartrate=options.get("stream_heartrate", False),
+                         max_workers=options.get("max_workers", 1),
+                         use_schemas=options.get("use_schemas", False),
+                         use_cache=options.get("use_cache", False),
+                         raw_data_dir=options.get("raw_data_dir"))
+
+    if stage == "standardize":
+        standardize_date_format(data, keep_datetime=options.get("keep_datetime", False))
+        return data
+
+    if stage == "convert":
+        convert_time_data_to_daily(data, max_workers=options.get("max_workers", 1))
+        return data
+
+    if stage == "merge":
+        return merge_all_data(data, use_sorted_merge=options.get("use_sorted_merge", False))
+
+    if stage == "clean":
+        return clean_data(data)
+
+    raise ValueError(f"Unknown stage '{stage}'. Expected one of: {', '.join(STAGES)}")
+
+def find_valid_prefix(raw_input_hash: str, checkpoint_dir: Path = CHECKPOINT_DIR) -> int:
+    """Counts the leading stages whose checkpoints match their current inputs.
+
+    Only manifests are read: each valid stage's output hash gives the next stage's input hash.
+
+    Args:
+        raw_input_hash (str): Input hash of the load stage.
+        checkpoint_dir (Path): Checkpoint directory.
+
+    Returns:
+        int: Number of leading stages that can be skipped.
+    """
+    input_hash = raw_input_hash
+
+    for position, stage in enumerate(STAGES):
+        manifest = read_stage_manifest(stage, checkpoint_dir)
+        if manifest is None or manifest["input_hash"] != input_hash:
+            return position
+
+        if position + 1 < len(STAGES):
+            input_hash = get_stage_input_hash(STAGES[position + 1], manifest["output_hash"])
+
+    return len(STAGES)
+
+@instrument_step
+def run_checkpointed_pipeline(resume_from: Optional[str] = None, export_csv: bool = True,
+                              checkpoint_dir: Path = CHECKPOINT_DIR, **options) -> pd.DataFrame:
+    """
+    Runs the data processing pipeline with a checkpoint after every stage.
+
+    Without resume_from, every leading stage whose inputs are unchanged is skipped and
+    only the checkpoint of the last such stage is loaded. With resume_from, the run
+    starts at that stage from the previous stage's checkpoint, recomputing it and every
+    later stage even if their inputs are unchanged.
+
+    Args:
+        resume_from (str): Stage to start at (one of STAGES), or None to decide automatically.
+        export_csv (bool): If True, write the pre-cleaned and cleaned datasets as CSV.
+        checkpoint_dir (Path): Checkpoint directory.
+        **options: Pipeline options, named as in handle_data_processing.
+
+    Returns:
+        pd.DataFrame: Fully cleaned dataset ready to be used in data analysis.
+    """
+    if resume_from is not None and resume_from not in STAGES:
+        raise ValueError(f"Unknown stage '{resume_from}'. Expected one of: {', '.join(STAGES)}")
+
+    raw_input_hash = hash_raw_inputs(options.get("raw_data_dir") or RAW_DATA_DIR, options, checkpoint_dir)
+
+    start = STAGES.index(resume_from) if resume_from else find_valid_prefix(raw_input_hash, checkpoint_dir)
+
+    data = None
+    previous_output_hash = None
+
+    if start > 0:
+        previous_stage = STAGES[start - 1]
+        data = read_checkpoint(previous_stage, checkpoint_dir)
+        previous_output_hash = read_stage_manifest(previous_stage, checkpoint_dir)["output_hash"]
+        logging.info("Loaded checkpoint of stage '%s', skipping: %s", previous_stage, ", ".join(STAGES[:start]))
+
+    for stage in STAGES[start:]:
+        if stage == "load":
+            input_hash = raw_input_hash
+        else:
+            input_hash = get_stage_input_hash(stage, previous_output_hash)
+
+        data = run_stage(stage, data, options)
+        previous_output_hash = write_checkpoint(stage, data, input_hash, checkpoint_dir)
+        logging.info("Saved checkpoint of stage '%s'", stage)
+
+        if export_csv and stage == "merge":
+            PRE_CLEANED_FILE.parent.mkdir(parents=True, exist_ok=True)
+            data.to_csv(PRE_CLEANED_FILE, index=False)
+
+    if export_csv and (start < len(STAGES) or not OUTPUT_FILE.exists()):
+        OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        data.to_csv(OUTPUT_FILE, index=False)
+
+    return data
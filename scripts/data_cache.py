@@ -0,0 +1,241 @@
+"""Fitbit Raw Data Cache Script.
+
+This script:
+1. Fingerprints raw CSV files by size, modification time and content hash.
+2. Stores parsed DataFrames as Parquet files, each next to a JSON manifest of its source fingerprint.
+3. Serves cached DataFrames while the source file and the parsing variant are unchanged,
+   and invalidates them when either changes.
+4. Keeps the cache under a size cap by evicting the least recently used entries.
+
+"""
+
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Callable, Optional
+import pandas as pd
+
+# Constants
+
+# Moves two levels up (from scripts/ to root)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Directory holding the cached Parquet files and their manifests
+CACHE_DIR = PROJECT_ROOT / "data" / "cache"
+
+# Maximum total size of the cached Parquet files (2 GB)
+CACHE_SIZE_LIMIT_BYTES = 2 * 1024 ** 3
+
+# Block size used when hashing source files
+HASH_BLOCK_SIZE = 1024 * 1024
+
+def hash_file(file: Path) -> str:
+    """Computes the SHA-256 hash of a file's contents.
+
+    Args:
+        file (Path): File to hash.
+
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+
+    with open(file, "rb") as handle:
+        for block in iter(lambda: handle.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+def fingerprint_file(file: Path, previous: Optional[dict] = None) -> dict:
+    """Fingerprints a file by size, modification time and content hash.
+
+    If size and modification time match the previous fingerprint, its hash is reused
+    instead of reading the file again.
+
+    Args:
+        file (Path): File to fingerprint.
+        previous (dict): Previous fingerprint of the file, if any.
+
+    Returns:
+        dict: 'size', 'mtime_ns' and 'sha256' of the file.
+    """
+    stat = file.stat()
+
+    if previous is not None and previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns:
+        sha256 = previous["sha256"]
+    else:
+        sha256 = hash_file(file)
+
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+
+def get_cache_key(file: Path, variant: str = "") -> str:
+    """Builds the cache key for a source file and the options it was parsed with.
+
+    Args:
+        file (Path): Source CSV file.
+        variant (str): Description of everything else that determines the parsed result
+            (e.g. from get_cache_variant in data_processing).
+
+    Returns:
+        str: Cache key used to name the entry's Parquet and manifest files.
+    """
+    source = f"{file.resolve()}|{variant}"
+
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:20]
+
+def read_manifest(manifest_file: Path) -> Optional[dict]:
+    """Reads a cache entry's manifest.
+
+    Args:
+        manifest_file (Path): Path to the manifest JSON file.
+
+    Returns:
+        dict: The manifest, or None if it is missing or unreadable.
+    """
+    try:
+        return json.loads(manifest_file.read_text())
+    except (OSError, ValueError):
+        return None
+
+def remove_entry(key: str, cache_dir: Path = CACHE_DIR, suffix: str = "parquet") -> None:
+    """Deletes a cache entry's data file and manifest.
+
+    Args:
+        key (str): Cache key of the entry.
+        cache_dir (Path): Cache directory.
+        suffix (str): File suffix of the entry's data file.
+    """
+    (cache_dir / f"{key}.{suffix}").unlink(missing_ok=True)
+    (cache_dir / f"{key}.json").unlink(missing_ok=True)
+
+def evict_entries(size_limit: int, cache_dir: Path, get_suffix: Callable[[dict], str] = lambda manifest: "parquet",
+                  label: str = "files") -> int:
+    """Evicts least recently used entries of a cache directory until it fits within the size limit.
+
+    Every entry is a data file named after its key plus a '<key>.json' manifest holding
+    its 'bytes' and 'last_used' time.
+
+    Args:
+        size_limit (int): Maximum total size of the entries' data files in bytes.
+        cache_dir (Path): Cache directory.
+        get_suffix (Callable): Returns the file suffix of an entry's data file from its manifest.
+        label (str): What the entries are, for the log message.
+
+    Returns:
+        int: Number of evicted entries.
+    """
+    if not cache_dir.exists():
+        return 0
+
+    entries = []
+    for manifest_file in cache_dir.glob("*.json"):
+        manifest = read_manifest(manifest_file)
+        if manifest is not None:
+            entries.append((manifest["last_used"], manifest["bytes"], manifest_file.stem, get_suffix(manifest)))
+
+    total_bytes = sum(size for _, size, _, _ in entries)
+    evicted = 0
+
+    # Oldest access first
+    for _, size, key, suffix in sorted(entries):
+        if total_bytes <= size_limit:
+            break
+
+        remove_entry(key, cache_dir, suffix)
+        total_bytes -= size
+        evicted += 1
+
+    if evicted:
+        logging.info("Evicted %d cached %s to stay under %d bytes", evicted, label, size_limit)
+
+    return evicted
+
+def load_cached_frame(file: Path, variant: str = "", cache_dir: Path = CACHE_DIR) -> Optional[pd.DataFrame]:
+    """Loads the cached DataFrame for a source file if the source and the variant are unchanged.
+
+    An entry stored with a different variant is a miss and is removed. The source's size
+    and modification time are checked first; the content hash is only recomputed when
+    they differ, so a touched but unchanged file is still a hit.
+
+    Args:
+        file (Path): Source CSV file.
+        variant (str): Description of the parsing options.
+        cache_dir (Path): Cache directory.
+
+    Returns:
+        pd.DataFrame: The cached DataFrame, or None on a cache miss.
+    """
+    key = get_cache_key(file, variant)
+    manifest_file = cache_dir / f"{key}.json"
+    cache_file = cache_dir / f"{key}.parquet"
+
+    manifest = read_manifest(manifest_file)
+    if manifest is None or not cache_file.exists():
+        return None
+
+    if manifest.get("variant") != variant:
+        remove_entry(key, cache_dir)
+        return None
+
+    stat = file.stat()
+    if stat.st_size != manifest["size"]:
+        remove_entry(key, cache_dir)
+        return None
+
+    if stat.st_mtime_ns != manifest["mtime_ns"]:
+        # Same size but touched - only a content change invalidates the entry
+        if hash_file(file) != manifest["sha256"]:
+            remove_entry(key, cache_dir)
+            return None
+
+        manifest["mtime_ns"] = stat.st_mtime_ns
+
+    df = pd.read_parquet(cache_file)
+
+    # Record the access for LRU eviction
+    manifest["last_used"] = time.time()
+    manifest_file.write_text(json.dumps(manifest))
+
+    return df
+
+def store_cached_frame(file: Path, df: pd.DataFrame, variant: str = "", cache_dir: Path = CACHE_DIR) -> None:
+    """Stores a parsed DataFrame as Parquet next to a manifest of its source fingerprint.
+
+    Args:
+        file (Path): Source CSV file the DataFrame was parsed from.
+        df (pd.DataFrame): Parsed DataFrame.
+        variant (str): Description of the parsing options.
+        cache_dir (Path): Cache directory.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    key = get_cache_key(file, variant)
+    cache_file = cache_dir / f"{key}.parquet"
+
+    stat = file.stat()
+    df.to_parquet(cache_file, index=False)
+
+    manifest = {
+        "source": str(file),
+        "variant": variant,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": hash_file(file),
+        "bytes": cache_file.stat().st_size,
+        "last_used": time.time(),
+    }
+    (cache_dir / f"{key}.json").write_text(json.dumps(manifest))
+
+def evict_cached_frames(size_limit: int = CACHE_SIZE_LIMIT_BYTES, cache_dir: Path = CACHE_DIR) -> int:
+    """Evicts least recently used entries until the cache fits within the size limit.
+
+    Args:
+        size_limit (int): Maximum total size of cached Parquet files in bytes.
+        cache_dir (Path): Cache directory.
+
+    Returns:
+        int: Number of evicted entries.
+    """
+    return evict_entries(size_limit, cache_dir)
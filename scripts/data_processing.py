@@ -11,11 +11,21 @@ This script:
 
 """
 
+import hashlib
+import inspect
+import json
 import logging
+import re
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 import pandas as pd
 import numpy as np
+from data_cache import evict_cached_frames, load_cached_frame, store_cached_frame
+from instrumentation import collect_worker_results, get_worker_state, instrument_step, run_in_worker
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
@@ -28,12 +38,13 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 # Define the raw data directory relative to the root
 RAW_DATA_DIR = PROJECT_ROOT / "data" / "raw"
 
-PROCESSED_DATA_DIR = Path("data/processed/")
+PROCESSED_DATA_DIR = PROJECT_ROOT / "data" / "processed"
 OUTPUT_FILE = PROCESSED_DATA_DIR / "merged_fitbit_data.csv"
+PRE_CLEANED_FILE = PROCESSED_DATA_DIR / "merged_pre_cleaned_data.csv"
 
-# Folder names (assuming two subfolders)
-FOLDER1 = RAW_DATA_DIR / "Fitabase Data 3.12.16-4.11.16"
-FOLDER2 = RAW_DATA_DIR / "Fitabase Data 4.12.16-5.12.16"
+# Export period folders are named like 'Fitabase Data 3.12.16-4.11.16' (any number of them),
+# possibly followed by a copy marker such as ' (1)'
+PERIOD_PATTERN = re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{2})-\d{1,2}\.\d{1,2}\.\d{2}(?![\d.])")
 
 # Files to keep - some files may get dropped upon further data exploration
 KEEP_FILES = {
@@ -61,6 +72,87 @@ REMOVE_FILES = {
     "minuteMETsNarrow_merged.csv",
 }
 
+# Second-level heart rate file, which can be aggregated while streaming instead of loaded whole
+HEARTRATE_SECONDS_FILE = "heartrate_seconds_merged.csv"
+
+# Number of rows read per chunk when streaming the heart rate data
+HEARTRATE_CHUNK_SIZE = 1_000_000
+
+# Version of the parsed file cache format; bump it when a change outside FILE_SCHEMAS and the
+# reader functions (see get_cache_variant) changes what a parsed file holds
+PARSE_CACHE_VERSION = 1
+
+# Timestamp formats used by the Fitabase exports
+DAY_FORMAT = "%m/%d/%Y"
+TIMESTAMP_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+
+# Declared read schema for every file in KEEP_FILES: columns to load (columns that later
+# steps drop are never parsed), compact dtypes, and the date column with its explicit format.
+# 'Id' stays int64 - the ids are 10-digit numbers and are used as merge and groupby keys.
+# Distances and weights stay float64, since float32 would change their rounded values.
+FILE_SCHEMAS = {
+    "dailyActivity_merged.csv": {
+        "dtype": {
+            "Id": "int64",
+            "TotalSteps": "int32",
+            "TotalDistance": "float64",
+            "TrackerDistance": "float64",
+            "LoggedActivitiesDistance": "float64",
+            "VeryActiveDistance": "float64",
+            "ModeratelyActiveDistance": "float64",
+            "LightActiveDistance": "float64",
+            "VeryActiveMinutes": "int16",
+            "FairlyActiveMinutes": "int16",
+            "LightlyActiveMinutes": "int16",
+            "SedentaryMinutes": "int16",
+            "Calories": "int32",
+        },
+        "date_column": "ActivityDate",
+        "date_format": DAY_FORMAT,
+    },
+    "sleepDay_merged.csv": {
+        "dtype": {
+            "Id": "int64",
+            "TotalMinutesAsleep": "int16",
+            "TotalTimeInBed": "int16",
+        },
+        "date_column": "SleepDay",
+        "date_format": TIMESTAMP_FORMAT,
+    },
+    "minuteSleep_merged.csv": {
+        "dtype": {
+            "Id": "int64",
+            "value": "uint8",
+        },
+        "date_column": "date",
+        "date_format": TIMESTAMP_FORMAT,
+    },
+    "heartrate_seconds_merged.csv": {
+        "dtype": {
+            "Id": "int64",
+            "Value": "uint8",
+        },
+        "date_column": "Time",
+        "date_format": TIMESTAMP_FORMAT,
+    },
+    "weightLogInfo_merged.csv": {
+        "dtype": {
+            "Id": "int64",
+            "WeightKg": "float64",
+            "WeightPounds": "float64",
+            "BMI": "float64",
+        },
+        "date_column": "Date",
+        "date_format": TIMESTAMP_FORMAT,
+    },
+}
+
+# Key columns for IQR outlier removal (excluding less critical ones)
+OUTLIER_COLUMNS = ["TotalSteps", "Calories", "VeryActiveMinutes", "TotalDistance"]
+
+# Biologically plausible range of average heart rate (bpm)
+HEART_RATE_BOUNDS = (30, 250)
+
 def compare_data_folders(folder1: Path, folder2: Path) -> dict:
     """Compares two data folders and identifies common and unique files.
 
@@ -109,43 +201,455 @@ def categorize_files(file_list: list) -> tuple:
 
     return files_to_keep, files_to_remove
 
-def load_data() -> dict:
+def get_period_start(folder: Path) -> Optional[datetime]:
+    """Parses the start date of an export period from its folder name.
+
+    Args:
+        folder (Path): Period folder (e.g. 'Fitabase Data 3.12.16-4.11.16').
+
+    Returns:
+        datetime: Start of the period, or None if the name has no date range.
+    """
+    match = PERIOD_PATTERN.search(folder.name)
+    if match is None:
+        return None
+
+    month, day, year = (int(part) for part in match.groups())
+
+    return datetime(2000 + year, month, day)
+
+def get_period_suffix(folder: Path) -> str:
+    """Builds the dfs key suffix of an export period from its folder name.
+
+    Suffixes are the period's start date as 'yyyy_mm_dd', so sorting them sorts periods
+    chronologically. Folders without a date range fall back to their sanitized name.
+
+    Args:
+        folder (Path): Period folder.
+
+    Returns:
+        str: Key suffix (e.g. '2016_03_12').
+    """
+    start = get_period_start(folder)
+    if start is None:
+        return re.sub(r"[^0-9A-Za-z]+", "_", folder.name).strip("_")
+
+    return f"{start:%Y_%m_%d}"
+
+def check_period_suffixes(folders: Iterable[Path]) -> None:
+    """Checks that no two period folders share a key suffix, which would make their data collide.
+
+    Args:
+        folders (Iterable[Path]): Period folders.
+
+    Raises:
+        ValueError: If two folders map to the same suffix, e.g. a period exported twice.
+    """
+    seen: Dict[str, Path] = {}
+
+    for folder in folders:
+        suffix = get_period_suffix(folder)
+
+        if suffix in seen and seen[suffix] != folder:
+            raise ValueError(f"Period folders '{seen[suffix].name}' and '{folder.name}' both map to period "
+                             f"'{suffix}'. Remove or rename one of them.")
+
+        seen[suffix] = folder
+
+def list_period_folders(raw_data_dir: Path) -> List[Path]:
+    """Lists the folders under the raw data directory that hold at least one relevant file.
+
+    Args:
+        raw_data_dir (Path): Directory holding the period folders.
+
+    Returns:
+        List[Path]: Period folders, oldest first (folders without a date range sort last by name).
+
+    Raises:
+        ValueError: If two folders map to the same period suffix.
+    """
+    folders = [folder for folder in raw_data_dir.iterdir()
+               if folder.is_dir() and any((folder / name).exists() for name in KEEP_FILES)]
+    check_period_suffixes(folders)
+
+    return sorted(folders, key=lambda folder: (get_period_start(folder) or datetime.max, folder.name))
+
+def get_period_keys(dfs: Dict[str, pd.DataFrame], stem: str) -> List[str]:
+    """Finds the keys of every period's DataFrame for a file stem, oldest period first.
+
+    Args:
+        dfs (Dict[str, pd.DataFrame]): Dictionary of DataFrames.
+        stem (str): File stem (e.g. 'dailyActivity_merged').
+
+    Returns:
+        List[str]: Matching keys (e.g. ['dailyActivity_merged_2016_03_12', ...]).
+    """
+    prefix = f"{stem}_"
+
+    return sorted(key for key in dfs if key.startswith(prefix))
+
+def map_periods(func: Callable[[pd.DataFrame], pd.DataFrame], frames: List[pd.DataFrame],
+                max_workers: int = 1) -> List[pd.DataFrame]:
+    """Applies a conversion to each period's DataFrame, in a thread pool when max_workers > 1.
+
+    Args:
+        func (Callable): Conversion taking and returning a DataFrame.
+        frames (List[pd.DataFrame]): One DataFrame per period.
+        max_workers (int): Number of periods converted at once.
+
+    Returns:
+        List[pd.DataFrame]: Converted DataFrames, in the order of frames.
+    """
+    if max_workers > 1 and len(frames) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(func, frames))
+
+    return [func(df) for df in frames]
+
+def concat_periods(dfs: Dict[str, pd.DataFrame], stem: str) -> pd.DataFrame:
+    """Concatenates every period's DataFrame for a file stem in a single concat, oldest period first.
+
+    Args:
+        dfs (Dict[str, pd.DataFrame]): Dictionary of DataFrames.
+        stem (str): File stem (e.g. 'sleepDay_merged').
+
+    Returns:
+        pd.DataFrame: Rows of all periods.
+    """
+    keys = get_period_keys(dfs, stem)
+    if not keys:
+        raise KeyError(f"No '{stem}' data was loaded for any period")
+
+    return pd.concat([dfs[key] for key in keys], ignore_index=True)
+
+def get_read_options(file_name: str) -> dict:
+    """Builds the pd.read_csv keyword arguments declared for a file in FILE_SCHEMAS.
+
+    The date column is kept in second position, which later steps rely on. It is read
+    as text and parsed afterwards by read_schema_csv, because parsing each distinct
+    timestamp once is much faster than read_csv parsing every row.
+
+    Args:
+        file_name (str): Name of the CSV file (e.g. 'dailyActivity_merged.csv').
+
+    Returns:
+        dict: Keyword arguments for pd.read_csv, or an empty dict if the file has no schema.
+    """
+    schema = FILE_SCHEMAS.get(file_name)
+    if schema is None:
+        return {}
+
+    date_col = schema["date_column"]
+
+    return {
+        "usecols": ["Id", date_col, *[col for col in schema["dtype"] if col != "Id"]],
+        "dtype": schema["dtype"],
+    }
+
+def read_schema_csv(file: Path) -> pd.DataFrame:
+    """Reads a CSV file with its declared schema and parses its date column.
+
+    Args:
+        file (Path): Path to the CSV file.
+
+    Returns:
+        pd.DataFrame: The parsed file.
+    """
+    df = pd.read_csv(file, **get_read_options(file.name))
+
+    schema = FILE_SCHEMAS.get(file.name)
+    if schema is not None:
+        date_col = schema["date_column"]
+        df[date_col] = parse_date_column(df[date_col], schema["date_format"])
+
+    return df
+
+@lru_cache(maxsize=None)
+def get_code_digest(funcs: Tuple[Callable, ...]) -> str:
+    """Hashes the source code of the given functions.
+
+    Args:
+        funcs (Tuple[Callable, ...]): Functions whose code determines a result.
+
+    Returns:
+        str: Hex digest of their source code.
+    """
+    digest = hashlib.sha256()
+
+    for func in funcs:
+        digest.update(inspect.getsource(func).encode("utf-8"))
+
+    return digest.hexdigest()[:16]
+
+def get_cache_variant(file: Path, use_schemas: bool = False, streamed: bool = False) -> str:
+    """Describes everything besides the source file that determines a parsed file's contents.
+
+    The variant covers the parsing options, the file's FILE_SCHEMAS entry, the code of the
+    reader functions used, the pandas version and PARSE_CACHE_VERSION, so a cached file is
+    only reused while all of them are unchanged.
+
+    Args:
+        file (Path): Source CSV file.
+        use_schemas (bool): Whether the file is read with its declared schema.
+        streamed (bool): Whether the file is aggregated by stream_heartrate_to_daily.
+
+    Returns:
+        str: Variant string for the data cache.
+    """
+    schema = FILE_SCHEMAS.get(file.name) if use_schemas else None
+    schema_digest = hashlib.sha256(json.dumps(schema, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    readers = []
+    if streamed:
+        readers.append(stream_heartrate_to_daily)
+    elif use_schemas:
+        readers.append(read_schema_csv)
+    if use_schemas or streamed:
+        readers.extend([get_read_options, parse_date_column])
+
+    return (f"v{PARSE_CACHE_VERSION}|schemas={use_schemas}|streamed={streamed}|schema={schema_digest}"
+            f"|code={get_code_digest(tuple(readers))}|pandas={pd.__version__}")
+
+def stream_heartrate_to_daily(file: Path, chunksize: int = HEARTRATE_CHUNK_SIZE,
+                              use_schemas: bool = False) -> pd.DataFrame:
+    """
+    Aggregates a second-level heart rate file into daily average heart rate per user
+    by reading it in fixed-size chunks, so peak memory is bounded by the chunk size.
+
+    Each chunk is folded into running per-(Id, Date) sums and counts.
+
+    Args:
+        file (Path): Path to a 'heartrate_seconds_merged.csv' file.
+        chunksize (int): Number of rows read per chunk.
+        use_schemas (bool): If True, read with the declared schema from FILE_SCHEMAS.
+
+    Returns:
+        pd.DataFrame: Daily heart rate with columns 'Id', 'Date' (datetime64 day) and 'AvgHeartRate'.
+    """
+    totals = None
+
+    read_options = get_read_options(file.name) if use_schemas else {}
+
+    for chunk in pd.read_csv(file, chunksize=chunksize, **read_options):
+        date_col = chunk.columns[1]  # Get the date column (index 1)
+
+        # Reduce each timestamp to its day before aggregating
+        chunk["Date"] = parse_date_column(chunk[date_col], TIMESTAMP_FORMAT).dt.normalize()
+
+        chunk_daily = chunk.groupby(["Id", "Date"]).agg(
+            ValueSum=("Value", "sum"),
+            ValueCount=("Value", "count")
+        )
+
+        # Fold the chunk into the running totals (a user-day may span chunks)
+        totals = chunk_daily if totals is None else totals.add(chunk_daily, fill_value=0)
+
+    if totals is None:
+        return pd.DataFrame(columns=["Id", "Date", "AvgHeartRate"])
+
+    totals = totals.sort_index()
+    totals["AvgHeartRate"] = totals["ValueSum"] / totals["ValueCount"]
+
+    return totals[["AvgHeartRate"]].reset_index()
+
+def read_data_file(file: Path, stream_heartrate: bool = False, use_schemas: bool = False,
+                   use_cache: bool = False) -> Tuple[str, pd.DataFrame, float]:
+    """Reads a single Fitbit CSV file and names it after its file stem and period suffix.
+
+    Args:
+        file (Path): Path to the CSV file.
+        stream_heartrate (bool): If True, a second-level heart rate file is aggregated
+            in chunks and returned as a 'heartrateDay_merged_*' daily summary.
+        use_schemas (bool): If True, read with the declared schema from FILE_SCHEMAS.
+        use_cache (bool): If True, load a cached Parquet copy when the source is unchanged,
+            and cache the parsed DataFrame otherwise.
+
+    Returns:
+        tuple: (file_name, DataFrame, seconds taken to read the file)
+    """
+    start = time.perf_counter()
+
+    time_period = get_period_suffix(file.parent)
+
+    streamed = stream_heartrate and file.name == HEARTRATE_SECONDS_FILE
+
+    if streamed:
+        file_name = f"heartrateDay_merged_{time_period}"
+    else:
+        file_name = f"{file.stem}_{time_period}"  # Append time period to filename
+
+    # Parsing options, schema and reader code that change the cached result
+    cache_variant = get_cache_variant(file, use_schemas, streamed)
+
+    df = load_cached_frame(file, cache_variant) if use_cache else None
+
+    if df is None:
+        if streamed:
+            df = stream_heartrate_to_daily(file, use_schemas=use_schemas)
+        else:
+            df = read_schema_csv(file) if use_schemas else pd.read_csv(file)
+
+        if use_cache:
+            store_cached_frame(file, df, cache_variant)
+
+    return file_name, df, time.perf_counter() - start
+
+def log_load_timings(timings: Dict[str, float], total_seconds: float) -> None:
+    """Logs how long each file took to load, slowest first, followed by the wall-clock total.
+
+    Args:
+        timings (Dict[str, float]): Seconds taken per loaded file name.
+        total_seconds (float): Wall-clock seconds taken to load all files.
+    """
+    for file_name, seconds in sorted(timings.items(), key=lambda item: item[1], reverse=True):
+        logging.info("Loaded %-35s in %.3fs", file_name, seconds)
+
+    logging.info("Loaded %d files in %.3fs (sum of per-file times: %.3fs)",
+                 len(timings), total_seconds, sum(timings.values()))
+
+@instrument_step
+def load_data(stream_heartrate: bool = False, max_workers: int = 1, use_processes: bool = False,
+              use_schemas: bool = False, use_cache: bool = False, raw_data_dir: Optional[Path] = None) -> dict:
     """Loads relevant CSV files into a dictionary of pandas DataFrames.
 
+    With more than one worker, files are parsed concurrently in a thread pool
+    (or a process pool if use_processes is True). A per-file timing report is logged.
+
     Args:
-        None.
+        stream_heartrate (bool): If True, second-level heart rate files are aggregated
+            in chunks and stored directly as 'heartrateDay_merged_*' daily summaries.
+        max_workers (int): Number of files parsed at once. 1 loads files sequentially.
+        use_processes (bool): If True, use a process pool instead of a thread pool.
+        use_schemas (bool): If True, read each file with its declared FILE_SCHEMAS entry
+            (column pruning, compact dtypes and explicit date parsing).
+        use_cache (bool): If True, parsed files are cached as Parquet and reused while
+            their source CSV is unchanged.
+        raw_data_dir (Path): Directory holding the period folders. Defaults to RAW_DATA_DIR.
 
     Returns:
-        dict: Dictionary where keys are modified filenames and values are DataFrames.
+        dict: Dictionary where keys are '<file stem>_<period suffix>' and values are DataFrames.
     """
 
     # List all files
-    all_files = list_all_files(RAW_DATA_DIR)
+    all_files = list_all_files(raw_data_dir or RAW_DATA_DIR)
 
     # Categorize files into 'keep' and 'remove'
     files_to_keep, _ = categorize_files(all_files)
 
+    # Files are keyed by their period suffix, so it must be unique per folder
+    check_period_suffixes(sorted({file.parent for file in files_to_keep}))
+
+    start = time.perf_counter()
+
+    if max_workers > 1 and use_processes:
+        # Worker processes return the records of their instrumented steps with each file
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = collect_worker_results(executor.map(partial(run_in_worker, get_worker_state(), read_data_file),
+                                                          files_to_keep,
+                                                          [stream_heartrate] * len(files_to_keep),
+                                                          [use_schemas] * len(files_to_keep),
+                                                          [use_cache] * len(files_to_keep)))
+    elif max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(read_data_file, files_to_keep,
+                                        [stream_heartrate] * len(files_to_keep),
+                                        [use_schemas] * len(files_to_keep),
+                                        [use_cache] * len(files_to_keep)))
+    else:
+        results = [read_data_file(file, stream_heartrate, use_schemas, use_cache) for file in files_to_keep]
+
     dfs = {}
-    for file in files_to_keep:
-        folder_name = file.parts[-2]  # Get the parent folder name
-        time_period = "3_12" if "3.12.16-4.11.16" in folder_name else "4_12"
-        
-        file_name = f"{file.stem}_{time_period}"  # Append time period to filename
-        
-        dfs[file_name] = pd.read_csv(file)
+    timings = {}
+    for file_name, df, seconds in results:
+        dfs[file_name] = df
+        timings[file_name] = seconds
+
+    log_load_timings(timings, time.perf_counter() - start)
+
+    if use_cache:
+        evict_cached_frames()
 
     return dfs
 
-def standardize_date_format(dfs: Dict[str, pd.DataFrame]) -> None:
+def get_date_format(key: str) -> Optional[str]:
+    """Looks up the declared date format for a DataFrame in dfs by its key.
+
+    Args:
+        key (str): Key in dfs (e.g. 'minuteSleep_merged_2016_03_12').
+
+    Returns:
+        str: The date format from FILE_SCHEMAS, or None if the file has no schema.
+    """
+    for file_name, schema in FILE_SCHEMAS.items():
+        if key.startswith(f"{Path(file_name).stem}_"):
+            return schema["date_format"]
+
+    return None
+
+def parse_date_column(col: pd.Series, date_format: Optional[str] = None) -> pd.Series:
+    """
+    Parses a column of date strings, parsing each distinct string only once.
+
+    Timestamps repeat heavily in the minute- and second-level files, so the unique
+    strings are parsed with the explicit format and mapped back to the rows. Strings
+    that don't match the format fall back to pandas' format inference.
+
+    Args:
+        col (pd.Series): Column of date strings (already parsed columns are returned as-is).
+        date_format (str): Explicit strptime format, or None to infer it.
+
+    Returns:
+        pd.Series: The parsed datetime64 column (NaT where parsing failed).
+    """
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col
+
+    codes, uniques = pd.factorize(col)
+    uniques = pd.Series(uniques, dtype="object")
+
+    parsed = pd.to_datetime(uniques, format=date_format, errors="coerce")
+
+    if date_format is not None:
+        unparsed = parsed.isna() & uniques.notna()
+        if unparsed.any():
+            parsed[unparsed] = pd.to_datetime(uniques[unparsed], errors="coerce")
+
+    values = pd.api.extensions.take(parsed.to_numpy(), codes, allow_fill=True)
+
+    return pd.Series(values, index=col.index, name=col.name)
+
+def format_day_strings(col: pd.Series) -> pd.Series:
+    """
+    Formats a datetime column as 'yyyy-mm-dd' strings, formatting each distinct day only once.
+
+    Args:
+        col (pd.Series): datetime64 column.
+
+    Returns:
+        pd.Series: Column of 'yyyy-mm-dd' strings (NaN where the date is missing).
+    """
+    codes, uniques = pd.factorize(col.dt.normalize())
+    strings = pd.Series(uniques).dt.strftime("%Y-%m-%d").to_numpy(dtype="object")
+
+    values = pd.api.extensions.take(strings, codes, allow_fill=True)
+
+    return pd.Series(values, index=col.index, name=col.name)
+
+@instrument_step
+def standardize_date_format(dfs: Dict[str, pd.DataFrame], keep_datetime: bool = False) -> None:
     """
     Renames the second column in each DataFrame to 'Date' and standardizes it to 'yyyy-mm-dd' format.
 
+    With keep_datetime, 'Date' is instead kept as a datetime64 column normalized to
+    midnight, so later groupbys and merges hash integers rather than strings.
+
     Modifies dfs in-place.
 
     Args:
         dfs (Dict[str, pd.DataFrame]): Dictionary of DataFrames.
+        keep_datetime (bool): If True, keep 'Date' as datetime64 days instead of strings.
     """
-    for _, df in dfs.items():
+    for key, df in dfs.items():
         if df.shape[1] > 1:  # Ensure at least two columns exist
             date_col = df.columns[1]  # Get the date column (index 1)
 
@@ -154,130 +658,202 @@ def standardize_date_format(dfs: Dict[str, pd.DataFrame]) -> None:
                 df.rename(columns={date_col: "Date"}, inplace=True)
                 date_col = "Date"
 
-            df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-            df[date_col] = df[date_col].dt.strftime("%Y-%m-%d")
+            parsed = parse_date_column(df[date_col], get_date_format(key))
+
+            if keep_datetime:
+                df[date_col] = parsed.dt.normalize()
+            else:
+                df[date_col] = format_day_strings(parsed)
 
-def convert_minute_sleep_to_daily(dfs: Dict[str, pd.DataFrame]) -> None:
+def rollup_minute_sleep(df_minute_sleep: pd.DataFrame) -> pd.DataFrame:
     """
-    Converts 'minuteSleep_merged_3_12' to daily sleep format like 'sleepDay_merged_4_12'
-    and removes unnecessary columns.
+    Rolls minute-level sleep data up to one row per user and day in a single pass.
+
+    (Id, Date) is factorized once and every count is a numpy bincount over the same
+    group codes. Sleep 'value' is 1 for asleep, 2 for restless and 3 for awake.
 
     Args:
-        dfs (Dict[str, pd.DataFrame]): Dictionary of DataFrames.
+        df_minute_sleep (pd.DataFrame): Minute-level sleep data with 'Id', a date column
+            at index 1 and 'value'.
 
+    Returns:
+        pd.DataFrame: Columns 'Id', the date column, 'TotalMinutesAsleep', 'TotalTimeInBed',
+            'TotalMinutesRestless' and 'TotalMinutesAwake', sorted by Id and date.
     """
-    if "minuteSleep_merged_3_12" in dfs:
-        df_minute_sleep = dfs["minuteSleep_merged_3_12"].copy()
+    date_col = df_minute_sleep.columns[1]  # Get the date column (index 1)
 
-        date_col = df_minute_sleep.columns[1]  # Get the date column (index 1)
+    id_codes, id_uniques = pd.factorize(df_minute_sleep["Id"], sort=True)
+    date_codes, date_uniques = pd.factorize(df_minute_sleep[date_col], sort=True)
 
-        # Remove 'logId' column
-        df_minute_sleep.drop(columns=["logId"], inplace=True, errors="ignore")
+    # Rows with a missing key are dropped, as groupby does
+    valid = (id_codes >= 0) & (date_codes >= 0)
+    group_keys = id_codes[valid].astype(np.int64) * len(date_uniques) + date_codes[valid]
+    group_codes, groups = pd.factorize(group_keys, sort=True)
 
-        # Compute TotalTimeInBed (Count all rows per Id, SleepDay)
-        sleep_summary = df_minute_sleep.groupby(["Id", date_col], as_index=False).size()
-        sleep_summary.rename(columns={"size": "TotalTimeInBed"}, inplace=True)
+    values = df_minute_sleep["value"].to_numpy()[valid]
+    n_groups = len(groups)
 
-        # Compute TotalMinutesAsleep (Count rows where 'value' == 1)
-        asleep_summary = df_minute_sleep[df_minute_sleep["value"] == 1].groupby(["Id", date_col], as_index=False).size()
-        asleep_summary.rename(columns={"size": "TotalMinutesAsleep"}, inplace=True)
+    def count_value(sleep_value: int) -> np.ndarray:
+        return np.bincount(group_codes, weights=values == sleep_value, minlength=n_groups).astype(np.int64)
 
-        # Merge both summaries
-        sleep_summary = sleep_summary.merge(asleep_summary, on=["Id", date_col], how="left")
-        sleep_summary.fillna(0, inplace=True)  # Replace NaN with 0 (for cases where no sleep was recorded)
+    return pd.DataFrame({
+        "Id": id_uniques.take(groups // len(date_uniques)),
+        date_col: date_uniques.take(groups % len(date_uniques)),
+        "TotalMinutesAsleep": count_value(1),
+        "TotalTimeInBed": np.bincount(group_codes, minlength=n_groups),
+        "TotalMinutesRestless": count_value(2),
+        "TotalMinutesAwake": count_value(3),
+    })
 
-        # Ensure column order matches 'sleepDay_merged_4_12'
-        sleep_summary = sleep_summary[["Id", date_col, "TotalMinutesAsleep", "TotalTimeInBed"]]
+def summarize_minute_sleep(df_minute_sleep: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts one period's minute-level sleep data to the daily 'sleepDay' format.
 
-        # Save as 'sleepDay_merged_3_12' for consistency
-        dfs["sleepDay_merged_3_12"] = sleep_summary
+    Args:
+        df_minute_sleep (pd.DataFrame): Minute-level sleep data.
 
-    # Remove unnecessary DataFrames
-    dfs.pop("minuteSleep_merged_3_12", None)
-    dfs.pop("minuteSleep_merged_4_12", None)
+    Returns:
+        pd.DataFrame: Columns 'Id', the date column, 'TotalMinutesAsleep' and 'TotalTimeInBed'.
+    """
+    date_col = df_minute_sleep.columns[1]  # Get the date column (index 1)
+
+    # Compute TotalTimeInBed (all rows) and TotalMinutesAsleep ('value' == 1) per Id and day
+    sleep_summary = rollup_minute_sleep(df_minute_sleep)
+
+    # Ensure column order matches 'sleepDay_merged'
+    return sleep_summary[["Id", date_col, "TotalMinutesAsleep", "TotalTimeInBed"]]
 
-def convert_second_heartrate_to_daily(dfs: Dict[str, pd.DataFrame]) -> None:
+def average_second_heartrate(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Converts 'heartrate_seconds_merged_3_12' and 'heartrate_seconds_merged_4_12'
-    into daily average heart rate format, renames them to 'heartrateDay_merged',
-    and removes the original second-level files.
+    Aggregates one period's second-level heart rate data to the daily average per user.
+
+    Args:
+        df (pd.DataFrame): Second-level heart rate data.
+
+    Returns:
+        pd.DataFrame: Columns 'Id', the date column and 'AvgHeartRate'.
+    """
+    date_col = df.columns[1]  # Get the date column (index 1)
+
+    return df.groupby(["Id", date_col], as_index=False).agg(
+        AvgHeartRate=("Value", "mean")
+    )
+
+def average_weight_logs(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Removes unnecessary columns from one period's weight logs and averages them per day.
+
+    Args:
+        df (pd.DataFrame): Weight log data.
+
+    Returns:
+        pd.DataFrame: Columns 'Id', the date column, 'AvgWeightKg', 'AvgWeightPounds' and 'AvgBMI'.
+    """
+    date_col = df.columns[1]  # Get the date column (index 1)
+
+    # Drop unnecessary columns
+    df = df.drop(columns=["Fat", "IsManualReport", "LogId"], errors="ignore")
+
+    # Aggregate to get daily averages
+    return df.groupby(["Id", date_col], as_index=False).agg(
+        AvgWeightKg=("WeightKg", "mean"),
+        AvgWeightPounds=("WeightPounds", "mean"),
+        AvgBMI=("BMI", "mean")
+    )
+
+@instrument_step
+def convert_minute_sleep_to_daily(dfs: Dict[str, pd.DataFrame], max_workers: int = 1) -> None:
+    """
+    Converts 'minuteSleep_merged_*' to the daily 'sleepDay_merged_*' format for every
+    period that has no 'sleepDay' file, and removes the minute-level DataFrames.
 
     Modifies dfs in-place.
 
     Args:
         dfs (Dict[str, pd.DataFrame]): Dictionary of DataFrames.
+        max_workers (int): Number of periods converted at once.
     """
-    rename_map = {
-        "heartrate_seconds_merged_3_12": "heartrateDay_merged_3_12",
-        "heartrate_seconds_merged_4_12": "heartrateDay_merged_4_12"
-    }
+    minute_keys = get_period_keys(dfs, "minuteSleep_merged")
 
-    for old_key, new_key in rename_map.items():
-        if old_key in dfs:
-            df = dfs[old_key].copy()
-            
-            date_col = df.columns[1]  # Get the date column (index 1)
+    # Periods with a 'sleepDay' file already have daily sleep data
+    keys = [key for key in minute_keys
+            if f"sleepDay_merged_{key[len('minuteSleep_merged_'):]}" not in dfs]
 
-            # Aggregate to get the daily average heart rate per user
-            df = df.groupby(["Id", date_col], as_index=False).agg(
-                AvgHeartRate=("Value", "mean")
-            )
+    summaries = map_periods(summarize_minute_sleep, [dfs[key] for key in keys], max_workers)
 
-            # Store in dfs with the new name
-            dfs[new_key] = df
+    for key, sleep_summary in zip(keys, summaries):
+        # Save as 'sleepDay_merged_*' for consistency
+        dfs[key.replace("minuteSleep_merged_", "sleepDay_merged_", 1)] = sleep_summary
 
-            # Remove the old file
-            del dfs[old_key]
+    # Remove unnecessary DataFrames
+    for key in minute_keys:
+        del dfs[key]
 
-def convert_minute_weight_to_daily(dfs: Dict[str, pd.DataFrame]) -> None:
+@instrument_step
+def convert_second_heartrate_to_daily(dfs: Dict[str, pd.DataFrame], max_workers: int = 1) -> None:
     """
-    Cleans and aggregates 'weightLogInfo_merged_3_12' and 'weightLogInfo_merged_4_12'
-    by removing unnecessary columns and averaging weight-related metrics per day.
+    Converts every period's 'heartrate_seconds_merged_*' into daily average heart rate
+    format, renames them to 'heartrateDay_merged_*', and removes the original second-level files.
 
     Modifies dfs in-place.
 
     Args:
         dfs (Dict[str, pd.DataFrame]): Dictionary of DataFrames.
+        max_workers (int): Number of periods converted at once.
     """
-    for key in ["weightLogInfo_merged_3_12", "weightLogInfo_merged_4_12"]:
-        if key in dfs:
-            df = dfs[key].copy()
+    keys = get_period_keys(dfs, "heartrate_seconds_merged")
 
-            date_col = df.columns[1]  # Get the date column (index 1)
-            
-            # Drop unnecessary columns
-            df.drop(columns=["Fat", "IsManualReport", "LogId"], inplace=True, errors="ignore")
+    daily = map_periods(average_second_heartrate, [dfs[key] for key in keys], max_workers)
 
-            # Aggregate to get daily averages
-            df = df.groupby(["Id", date_col], as_index=False).agg(
-                AvgWeightKg=("WeightKg", "mean"),
-                AvgWeightPounds=("WeightPounds", "mean"),
-                AvgBMI=("BMI", "mean")
-            )
+    for old_key, df in zip(keys, daily):
+        # Store in dfs with the new name
+        dfs[old_key.replace("heartrate_seconds_merged_", "heartrateDay_merged_", 1)] = df
 
-            # Save back to dfs
-            dfs[key] = df
+        # Remove the old file
+        del dfs[old_key]
 
-def convert_time_data_to_daily(dfs: Dict[str, pd.DataFrame]) -> None:
+@instrument_step
+def convert_minute_weight_to_daily(dfs: Dict[str, pd.DataFrame], max_workers: int = 1) -> None:
+    """
+    Cleans and aggregates every period's 'weightLogInfo_merged_*' by removing
+    unnecessary columns and averaging weight-related metrics per day.
+
+    Modifies dfs in-place.
+
+    Args:
+        dfs (Dict[str, pd.DataFrame]): Dictionary of DataFrames.
+        max_workers (int): Number of periods converted at once.
+    """
+    keys = get_period_keys(dfs, "weightLogInfo_merged")
+
+    daily = map_periods(average_weight_logs, [dfs[key] for key in keys], max_workers)
+
+    # Save back to dfs
+    dfs.update(zip(keys, daily))
+
+@instrument_step
+def convert_time_data_to_daily(dfs: Dict[str, pd.DataFrame], max_workers: int = 1) -> None:
     """
     Converts time-based data (minute and second-level) into daily summaries.
 
     Args:
         dfs (Dict[str, pd.DataFrame]): Dictionary of DataFrames to be modified.
+        max_workers (int): Number of periods of a metric converted at once.
     """
     
     # Convert sleep data from minute format to day format
-    convert_minute_sleep_to_daily(dfs)
+    convert_minute_sleep_to_daily(dfs, max_workers)
 
     # Convert heartrate data from seconds format to day format
-    convert_second_heartrate_to_daily(dfs)
+    convert_second_heartrate_to_daily(dfs, max_workers)
 
     # Convert weight data from minute format to day format
-    convert_minute_weight_to_daily(dfs)
+    convert_minute_weight_to_daily(dfs, max_workers)
 
+@instrument_step
 def merge_activity_data(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     """
-    Merges daily activity data from both time periods and drops unnecessary columns.
+    Merges daily activity data from all time periods and drops unnecessary columns.
 
     Args:
         dfs (Dict[str, pd.DataFrame]): Dictionary containing DataFrames.
@@ -285,13 +861,14 @@ def merge_activity_data(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Merged daily activity dataset with unnecessary columns removed.
     """
-    activity_merged = pd.concat([dfs["dailyActivity_merged_3_12"], dfs["dailyActivity_merged_4_12"]], ignore_index=True)
+    activity_merged = concat_periods(dfs, "dailyActivity_merged")
 
     return activity_merged
 
+@instrument_step
 def merge_sleep_data(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     """
-    Merges sleep data from both time periods and drops unnecessary columns.
+    Merges sleep data from all time periods and drops unnecessary columns.
 
     Args:
         dfs (Dict[str, pd.DataFrame]): Dictionary containing DataFrames.
@@ -299,15 +876,16 @@ def merge_sleep_data(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Merged sleep dataset with unnecessary columns removed.
     """
-    sleep_merged = pd.concat([dfs["sleepDay_merged_3_12"], dfs["sleepDay_merged_4_12"]], ignore_index=True)
+    sleep_merged = concat_periods(dfs, "sleepDay_merged")
 
     sleep_merged.drop(columns=["TotalSleepRecords"], errors="ignore", inplace=True)
 
     return sleep_merged
 
+@instrument_step
 def merge_weight_data(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     """
-    Merges weight data from both time periods and drops unnecessary columns.
+    Merges weight data from all time periods and drops unnecessary columns.
 
     Args:
         dfs (Dict[str, pd.DataFrame]): Dictionary containing DataFrames.
@@ -315,13 +893,14 @@ def merge_weight_data(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Merged weight dataset with unnecessary columns removed.
     """
-    weight_merged = pd.concat([dfs["weightLogInfo_merged_3_12"], dfs["weightLogInfo_merged_4_12"]], ignore_index=True)
+    weight_merged = concat_periods(dfs, "weightLogInfo_merged")
 
     return weight_merged
 
+@instrument_step
 def merge_heart_rate_data(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     """
-    Merges heart rate data from both time periods and drops unnecessary columns.
+    Merges heart rate data from all time periods and drops unnecessary columns.
 
     Args:
         dfs (Dict[str, pd.DataFrame]): Dictionary containing DataFrames.
@@ -329,16 +908,42 @@ def merge_heart_rate_data(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Merged heart rate dataset with unnecessary columns removed.
     """
-    heartrate_merged = pd.concat([dfs["heartrateDay_merged_3_12"], dfs["heartrateDay_merged_4_12"]], ignore_index=True)
+    heartrate_merged = concat_periods(dfs, "heartrateDay_merged")
 
     return heartrate_merged
 
-def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
+@instrument_step
+def restore_default_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Casts compact numeric columns (from FILE_SCHEMAS) back to int64 and float64, the dtypes
+    pd.read_csv infers, so the cleaned dataset has the same dtypes as without schemas.
+
+    The compact dtypes only save memory while loading and converting the raw files.
+
+    Args:
+        df (pd.DataFrame): The merged dataset.
+
+    Returns:
+        pd.DataFrame: The dataset with 64-bit numeric columns.
+    """
+    casts = {}
+    for col, dtype in df.dtypes.items():
+        if dtype.kind == "f" and dtype.itemsize < 8:
+            casts[col] = "float64"
+        elif dtype.kind in "iu" and dtype.itemsize < 8:
+            casts[col] = "int64"
+
+    return df.astype(casts) if casts else df
+
+@instrument_step
+def handle_missing_values(df: pd.DataFrame, calories_per_step: Optional[float] = None) -> pd.DataFrame:
     """
     Handles missing values by dropping essential missing rows and imputing others.
 
     Args:
         df (pd.DataFrame): The dataset.
+        calories_per_step (float): Precomputed Calories per step ratio, for callers that
+            clean one partition of the dataset at a time. Computed from df if not given.
 
     Returns:
         pd.DataFrame: The dataset with missing values handled.
@@ -357,12 +962,15 @@ def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     df["AvgHeartRate"] = df["AvgHeartRate"].fillna(df.groupby("Id")["AvgHeartRate"].transform("mean"))
 
     # Fill missing Calories based on Calories per Step ratio
-    avg_calories_per_step = df["Calories"].sum() / df["TotalSteps"].sum()
+    avg_calories_per_step = calories_per_step
+    if avg_calories_per_step is None:
+        avg_calories_per_step = df["Calories"].sum() / df["TotalSteps"].sum()
     
     df["Calories"].fillna(df["TotalSteps"] * avg_calories_per_step)
 
     return df
 
+@instrument_step
 def flag_weight_tracking(df: pd.DataFrame) -> pd.DataFrame:
     """
     Flags users who track weight and BMI:
@@ -380,38 +988,125 @@ def flag_weight_tracking(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
-def handle_outliers(df: pd.DataFrame) -> pd.DataFrame:
+def compute_outlier_bounds(df: pd.DataFrame, sequential: bool = True) -> Dict[str, Tuple[float, float]]:
     """
-    Detects and removes rows with extreme outliers using the IQR method.
+    Computes the IQR outlier bounds of every column in OUTLIER_COLUMNS, plus the fixed
+    biologically plausible heart rate range.
+
+    By default, each column's quartiles are computed on the rows within the bounds of the
+    columns before it, as when the IQR filters are applied one after another; applying
+    all the bounds at once then removes exactly the rows those filters would. With
+    sequential=False, every column's quartiles come from df itself in one batched quantile
+    call. Rows outside an earlier column's bounds then still shape the later columns'
+    quartiles, so the kept rows can differ from those of the filters applied in turn.
 
     Args:
         df (pd.DataFrame): The dataset.
+        sequential (bool): If False, compute every column's quartiles on the full frame.
 
     Returns:
-        pd.DataFrame: The dataset with outlier rows removed.
+        Dict[str, Tuple[float, float]]: (lower_bound, upper_bound) per column.
     """
+    if not sequential:
+        quantiles = df[OUTLIER_COLUMNS].quantile([0.25, 0.75])
+        quartiles = {col: (quantiles.at[0.25, col], quantiles.at[0.75, col]) for col in OUTLIER_COLUMNS}
+
+        return get_iqr_bounds(quartiles)
+
+    values = df[OUTLIER_COLUMNS].to_numpy(dtype="float64")
+    keep = np.ones(len(values), dtype=bool)
+    quartiles = {}
 
-   # Define key columns for outlier removal (excluding less critical ones)
-    outlier_columns = ["TotalSteps", "Calories", "VeryActiveMinutes", "TotalDistance"]
+    for position, col in enumerate(OUTLIER_COLUMNS):
+        column = values[:, position]
+        remaining = column[keep & ~np.isnan(column)]
 
-    for col in outlier_columns:
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
+        quartiles[col] = tuple(np.quantile(remaining, [0.25, 0.75])) if len(remaining) else (np.nan, np.nan)
+        lower, upper = get_iqr_bounds({col: quartiles[col]})[col]
+
+        keep &= np.isnan(column) | ((column >= lower) & (column <= upper))
+
+    return get_iqr_bounds(quartiles)
+
+def get_iqr_bounds(quartiles: Dict[str, Tuple[float, float]]) -> Dict[str, Tuple[float, float]]:
+    """
+    Turns the first and third quartiles of each column into IQR outlier bounds, plus
+    the fixed biologically plausible heart rate range.
+
+    Args:
+        quartiles (Dict[str, Tuple[float, float]]): (Q1, Q3) per column.
+
+    Returns:
+        Dict[str, Tuple[float, float]]: (lower_bound, upper_bound) per column.
+    """
+    bounds = {}
+    for col, (Q1, Q3) in quartiles.items():
         IQR = Q3 - Q1
-        lower_bound = Q1 - (1.5 * IQR)
-        upper_bound = Q3 + (1.5 * IQR)
+        bounds[col] = (Q1 - (1.5 * IQR), Q3 + (1.5 * IQR))
 
-        # Remove entire rows where any column has extreme outlier values
-        df = df[(df[col].isna()) | ((df[col] >= lower_bound) & (df[col] <= upper_bound))]
+    bounds["AvgHeartRate"] = HEART_RATE_BOUNDS
+
+    return bounds
+
+def build_outlier_mask(df: pd.DataFrame, bounds: Dict[str, Tuple[float, float]]) -> pd.Series:
+    """
+    Builds one combined mask of the rows to keep: every bounded column must be
+    missing or within its bounds.
+
+    Args:
+        df (pd.DataFrame): The dataset.
+        bounds (Dict[str, Tuple[float, float]]): (lower_bound, upper_bound) per column.
+
+    Returns:
+        pd.Series: Boolean mask aligned with df, True for rows to keep.
+    """
+    cols = list(bounds)
+    values = df[cols].to_numpy(dtype="float64")
+    lower = np.array([bounds[col][0] for col in cols])
+    upper = np.array([bounds[col][1] for col in cols])
+
+    within = np.isnan(values) | ((values >= lower) & (values <= upper))
+
+    return pd.Series(within.all(axis=1), index=df.index)
+
+@instrument_step
+def handle_outliers(df: pd.DataFrame, bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+                    return_mask: bool = False, sequential: bool = True):
+    """
+    Detects and removes rows with extreme outliers using the IQR method.
 
-    # Remove biologically implausible heart rate values
-    df = df[(df["AvgHeartRate"].isna()) | ((df["AvgHeartRate"] >= 30) & (df["AvgHeartRate"] <= 250))]
+    All bounds are computed up front and combined into a single mask, so the frame is
+    filtered only once.
+
+    Args:
+        df (pd.DataFrame): The dataset.
+        bounds (Dict[str, Tuple[float, float]]): Precomputed bounds per column.
+            Computed from df with compute_outlier_bounds if not given.
+        sequential (bool): Passed to compute_outlier_bounds when bounds are not given.
+            If False, every column's bounds come from the full frame, which removes fewer rows.
+        return_mask (bool): If True, also return the keep mask and the bounds used,
+            so callers can audit the removed rows without filtering again.
+
+    Returns:
+        pd.DataFrame: The dataset with outlier rows removed, or a tuple
+            (DataFrame, keep mask, bounds) if return_mask is True.
+    """
+    if bounds is None:
+        bounds = compute_outlier_bounds(df, sequential=sequential)
+
+    # Remove entire rows where any column has extreme outlier values
+    keep_mask = build_outlier_mask(df, bounds)
+    df = df[keep_mask]
 
     # Flag users who track heart rate data
     df["HasHeartRateData"] = df["AvgHeartRate"].notna().astype(int)
 
+    if return_mask:
+        return df, keep_mask, bounds
+
     return df
 
+@instrument_step
 def add_derived_metrics(df: pd.DataFrame) -> pd.DataFrame:
     """
     Adds new columns for additional insights.
@@ -430,6 +1125,7 @@ def add_derived_metrics(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
+@instrument_step
 def drop_unnecessary_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     Drops columns that are redundant or not useful for analysis.
@@ -444,6 +1140,7 @@ def drop_unnecessary_columns(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
+@instrument_step
 def handle_duplicates(df: pd.DataFrame) -> pd.DataFrame:
     """
     Removes duplicate records and ensures only one entry per user per day.
@@ -459,10 +1156,14 @@ def handle_duplicates(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
+@instrument_step
 def handle_negative_values(df: pd.DataFrame) -> pd.DataFrame:
     """
     Ensures all numerical values are non-negative by replacing negative values with NaN.
 
+    Negative values are found with one vectorized comparison over the numeric block,
+    and only columns that contain negatives are rewritten, so all other dtypes are kept.
+
     Args:
         df (pd.DataFrame): The dataset.
 
@@ -470,13 +1171,19 @@ def handle_negative_values(df: pd.DataFrame) -> pd.DataFrame:
         pd.DataFrame: The dataset with no negative values.
     """
     # Identify all numerical columns
-    numeric_cols = df.select_dtypes(include=["number"]).columns
+    numeric_df = df.select_dtypes(include=["number"])
 
-    # Replace negative values with NaN
-    df[numeric_cols] = df[numeric_cols].apply(lambda col: col.map(lambda x: np.nan if x < 0 else x))
+    # Flag negative values across the whole numeric block at once
+    negative_mask = numeric_df.lt(0)
+    negative_cols = negative_mask.columns[negative_mask.any()]
+
+    # Replace negative values with NaN (integer columns become float to hold NaN)
+    if len(negative_cols) > 0:
+        df[negative_cols] = numeric_df[negative_cols].mask(negative_mask[negative_cols])
 
     return df
 
+@instrument_step
 def round_decimal_values(df: pd.DataFrame) -> pd.DataFrame:
     """
     Rounds all numerical columns to 2 decimal places, except for 'Id' and binary flag columns.
@@ -498,6 +1205,20 @@ def round_decimal_values(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
+# Cleaning steps applied by clean_data, in order
+CLEANING_STEPS = [
+    restore_default_dtypes,
+    handle_duplicates,
+    handle_missing_values,
+    flag_weight_tracking,
+    handle_outliers,
+    add_derived_metrics,
+    drop_unnecessary_columns,
+    handle_negative_values,
+    round_decimal_values,
+]
+
+@instrument_step
 def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Cleans the dataset by handling missing values, removing outliers,
@@ -510,23 +1231,125 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
         pd.DataFrame: The fully cleaned dataset.
     """
 
-    df = handle_duplicates(df)
-    df = handle_missing_values(df)
-    df = flag_weight_tracking(df)
-    df = handle_outliers(df)
-    df = add_derived_metrics(df)
-    df = drop_unnecessary_columns(df)
-    df = handle_negative_values(df)
-    df = round_decimal_values(df)
+    for step in CLEANING_STEPS:
+        df = step(df)
 
     return df
 
-def merge_all_data(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+def encode_merge_keys(frames: List[pd.DataFrame], on: List[str]) -> List[np.ndarray]:
+    """
+    Encodes the key columns of several DataFrames as a single int64 key per row.
+
+    Each key column is factorized once across all frames, so equal keys (including
+    missing ones, which pandas merges as equal) get equal codes in every frame.
+
+    Args:
+        frames (List[pd.DataFrame]): DataFrames sharing the key columns.
+        on (List[str]): Key columns (e.g. ['Id', 'Date']).
+
+    Returns:
+        List[np.ndarray]: One int64 key array per frame.
+    """
+    combined_keys = None
+
+    for col in on:
+        values = pd.concat([frame[col] for frame in frames], ignore_index=True)
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        codes = codes.astype(np.int64)
+
+        combined_keys = codes if combined_keys is None else combined_keys * len(uniques) + codes
+
+    split_points = np.cumsum([len(frame) for frame in frames])[:-1]
+
+    return np.split(combined_keys, split_points)
+
+def take_column(col: pd.Series, positions: np.ndarray) -> pd.Series:
+    """
+    Takes rows from a column by position, where -1 marks a missing row (filled with NaN).
+
+    Dtypes are promoted exactly as a pandas left merge would (e.g. int to float only
+    when a row is missing).
+
+    Args:
+        col (pd.Series): Column to take from.
+        positions (np.ndarray): Row positions, -1 for missing.
+
+    Returns:
+        pd.Series: The taken column with a fresh RangeIndex.
+    """
+    values = col.to_numpy() if isinstance(col.dtype, np.dtype) else col.array
+    has_missing = bool((positions < 0).any())
+
+    return pd.Series(pd.api.extensions.take(values, positions, allow_fill=has_missing), name=col.name)
+
+def sorted_left_merge(left: pd.DataFrame, rights: List[pd.DataFrame], on: List[str]) -> pd.DataFrame:
+    """
+    Left-merges several DataFrames onto one in a single aligned join.
+
+    The keys are encoded as one int64 per row, each right side is sorted once, and
+    matching rows are found by binary search. The result matches chained
+    'left.merge(right, on=on, how="left")' calls, including row order and the
+    expansion of rows for duplicate right keys.
+
+    Args:
+        left (pd.DataFrame): Left DataFrame whose rows are all kept.
+        rights (List[pd.DataFrame]): DataFrames merged onto left, in order.
+        on (List[str]): Key columns.
+
+    Returns:
+        pd.DataFrame: The merged DataFrame.
+    """
+    keys = encode_merge_keys([left, *rights], on)
+    left_keys = keys[0]
+
+    # Row positions into each input that make up the output rows
+    left_positions = np.arange(len(left))
+    right_positions = []
+
+    for right, right_keys in zip(rights, keys[1:]):
+        if len(right) == 0:
+            right_positions.append(np.full(len(left_positions), -1))
+            continue
+
+        # Stable sort keeps duplicate keys in the right frame's original order
+        order = np.argsort(right_keys, kind="stable")
+        sorted_keys = right_keys[order]
+
+        current_keys = left_keys[left_positions]
+        starts = np.searchsorted(sorted_keys, current_keys, side="left")
+        counts = np.searchsorted(sorted_keys, current_keys, side="right") - starts
+
+        if counts.max(initial=0) > 1:
+            # Duplicate right keys: repeat output rows once per match
+            repeats = np.maximum(counts, 1)
+            left_positions = np.repeat(left_positions, repeats)
+            right_positions = [np.repeat(positions, repeats) for positions in right_positions]
+
+            offsets = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+            starts = np.repeat(starts, repeats) + offsets
+            counts = np.repeat(counts, repeats)
+
+        matched = np.minimum(starts, len(order) - 1)
+        right_positions.append(np.where(counts > 0, order[matched], -1))
+
+    columns = {col: take_column(left[col], left_positions) for col in left.columns}
+
+    for right, positions in zip(rights, right_positions):
+        for col in right.columns:
+            if col not in on:
+                columns[col] = take_column(right[col], positions)
+
+    return pd.DataFrame(columns)
+
+@instrument_step
+def merge_all_data(dfs: Dict[str, pd.DataFrame], use_sorted_merge: bool = False) -> pd.DataFrame:
     """
     Merges all related datasets and consolidates them into a unified dataset.
 
     Args:
         dfs (Dict[str, pd.DataFrame]): Dictionary containing DataFrames.
+        use_sorted_merge (bool): If True, join everything in one pass with sorted_left_merge
+            instead of chained hash merges.
 
     Returns:
         pd.DataFrame: Fully merged dataset containing daily activity, sleep, weight, and heart rate data.
@@ -538,6 +1361,13 @@ def merge_all_data(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     heartrate_data = merge_heart_rate_data(dfs)
 
     # Merge everything together into one DataFrame
+    right_data = [sleep_data, weight_data, heartrate_data]
+    value_cols = [col for df in [activity_data, *right_data] for col in df.columns if col not in ("Id", "Date")]
+
+    # Overlapping non-key columns need merge's suffixes, so they use the hash merge
+    if use_sorted_merge and len(value_cols) == len(set(value_cols)):
+        return sorted_left_merge(activity_data, right_data, on=["Id", "Date"])
+
     merged_df = activity_data \
         .merge(sleep_data, on=["Id", "Date"], how="left") \
         .merge(weight_data, on=["Id", "Date"], how="left") \
@@ -545,7 +1375,11 @@ def merge_all_data(dfs: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     
     return merged_df
 
-def handle_data_processing() -> pd.DataFrame:
+@instrument_step
+def handle_data_processing(stream_heartrate: bool = False, max_workers: int = 1,
+                           use_schemas: bool = False, use_cache: bool = False,
+                           use_sorted_merge: bool = False, keep_datetime: bool = False,
+                           raw_data_dir: Optional[Path] = None, backend: str = "pandas") -> pd.DataFrame:
     """
     Executes the full Fitbit data processing pipeline.
 
@@ -557,26 +1391,52 @@ def handle_data_processing() -> pd.DataFrame:
     - Cleans the merged dataset to handle missing values, outliers, and inconsistencies.
 
     Args:
-        None.
+        stream_heartrate (bool): If True, second-level heart rate data is aggregated in
+            chunks while loading, keeping peak memory bounded by the chunk size.
+        max_workers (int): Number of raw files parsed concurrently while loading, and of
+            periods converted concurrently per metric.
+        use_schemas (bool): If True, raw files are read with declared dtypes and columns.
+        use_cache (bool): If True, unchanged raw files are loaded from the Parquet cache.
+        use_sorted_merge (bool): If True, datasets are joined with the sorted int64-key merge.
+        keep_datetime (bool): If True, 'Date' stays datetime64 throughout instead of
+            'yyyy-mm-dd' strings (to_csv still writes it as yyyy-mm-dd).
+        raw_data_dir (Path): Directory holding the period folders. Defaults to RAW_DATA_DIR.
+        backend (str): 'pandas', 'polars' to run the whole pipeline as one lazy Polars
+            query (requires polars; only raw_data_dir, use_schemas and keep_datetime apply),
+            or 'duckdb' to convert and merge the raw files in place with DuckDB before
+            cleaning with pandas (requires duckdb; only raw_data_dir and keep_datetime apply).
     
     Returns:
         pd.DataFrame: Fully cleaned dataset ready to be used in data analysis.
     """
+    if backend == "polars":
+        from polars_backend import run_polars_pipeline  # Imported here, as it imports this module
+
+        return run_polars_pipeline(raw_data_dir=raw_data_dir, use_schemas=use_schemas, keep_datetime=keep_datetime)
+
+    if backend == "duckdb":
+        from duckdb_backend import run_duckdb_merge  # Imported here, as it imports this module
+
+        return clean_data(run_duckdb_merge(raw_data_dir=raw_data_dir, keep_datetime=keep_datetime))
+
+    if backend != "pandas":
+        raise ValueError(f"Unknown backend '{backend}'. Expected 'pandas', 'polars' or 'duckdb'.")
 
     # Load the necessary data
-    dfs = load_data()
+    dfs = load_data(stream_heartrate=stream_heartrate, max_workers=max_workers,
+                    use_schemas=use_schemas, use_cache=use_cache, raw_data_dir=raw_data_dir)
 
     # Standardize all date columns into yyyy-mm-dd format
-    standardize_date_format(dfs)
+    standardize_date_format(dfs, keep_datetime=keep_datetime)
 
     # Convert time-based data (minute & second-level) to a daily summary
-    convert_time_data_to_daily(dfs)
+    convert_time_data_to_daily(dfs, max_workers=max_workers)
 
     # Merge related datasets and combine them into one DataFrame
-    merged_df = merge_all_data(dfs)
+    merged_df = merge_all_data(dfs, use_sorted_merge=use_sorted_merge)
 
     # Save the final dataset for analysis
-    # merged_df.to_csv(f"{PROCESSED_DATA_DIR}/merged_pre_cleaned_data.csv", index=False)
+    # merged_df.to_csv(PRE_CLEANED_FILE, index=False)
 
     # Clean the merged dataset
     cleaned_df = clean_data(merged_df)
@@ -0,0 +1,200 @@
+"""Fitbit DuckDB Backend Script.
+
+This script:
+1. Expresses convert_time_data_to_daily as SQL: grouped daily rollups of the heart rate,
+   sleep and weight files, read in place by DuckDB's CSV reader.
+2. Expresses merge_all_data as SQL: each daily table concatenated over all periods and
+   left-joined onto daily activity.
+3. Runs the query on all cores, spilling to disk when it exceeds the memory limit.
+4. Returns the merged frame in the form clean_data consumes.
+
+DuckDB is optional: install it with `pip install duckdb` to use this backend.
+
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+import pandas as pd
+from data_processing import DAY_FORMAT, FILE_SCHEMAS, RAW_DATA_DIR, TIMESTAMP_FORMAT, list_period_folders
+from instrumentation import instrument_step
+
+try:
+    import duckdb
+except ImportError:  # DuckDB is an optional dependency
+    duckdb = None
+
+def require_duckdb() -> None:
+    """Raises an ImportError with install instructions if DuckDB is missing."""
+    if duckdb is None:
+        raise ImportError("The DuckDB backend requires duckdb. Install it with `pip install duckdb`.")
+
+def quote_literal(text: str) -> str:
+    """Quotes a string as an SQL literal."""
+    return "'" + text.replace("'", "''") + "'"
+
+def scan_file_sql(file: Path, columns: List[str]) -> str:
+    """
+    Builds a subquery reading a raw CSV file in place, with its date column parsed to a day
+    and renamed to 'Date'.
+
+    The date column is parsed with the file's declared format, falling back to the
+    other Fitabase date format.
+
+    Args:
+        file (Path): Raw CSV file.
+        columns (List[str]): Columns to select besides Id and the date column.
+
+    Returns:
+        str: SQL subquery.
+    """
+    schema = FILE_SCHEMAS[file.name]
+    date_col = schema["date_column"]
+    formats = [schema["date_format"], DAY_FORMAT if schema["date_format"] == TIMESTAMP_FORMAT else TIMESTAMP_FORMAT]
+
+    selected = "".join(f', "{col}"' for col in columns)
+
+    return (
+        f'SELECT "Id", CAST(try_strptime("{date_col}", [{", ".join(quote_literal(fmt) for fmt in formats)}]) AS DATE) '
+        f'AS "Date"{selected} '
+        f'FROM read_csv({quote_literal(str(file))}, header = true, '
+        f"types = {{'Id': 'BIGINT', {quote_literal(date_col)}: 'VARCHAR'}})"
+    )
+
+def get_activity_columns(file: Path) -> List[str]:
+    """Lists the columns of a daily activity file after Id and the date column."""
+    with open(file, encoding="utf-8") as handle:
+        header = handle.readline().strip().split(",")
+
+    return header[2:]
+
+def build_period_queries(folder: Path) -> Dict[str, str]:
+    """
+    Builds the SQL of one period's daily activity, sleep, weight and heart rate tables,
+    as convert_time_data_to_daily does.
+
+    Args:
+        folder (Path): Period folder.
+
+    Returns:
+        Dict[str, str]: SQL subquery per table name (missing files are skipped).
+    """
+    queries = {}
+
+    activity_file = folder / "dailyActivity_merged.csv"
+    if activity_file.exists():
+        queries["activity"] = scan_file_sql(activity_file, get_activity_columns(activity_file))
+
+    sleep_file = folder / "sleepDay_merged.csv"
+    minute_sleep_file = folder / "minuteSleep_merged.csv"
+    if sleep_file.exists():
+        queries["sleep"] = scan_file_sql(sleep_file, ["TotalMinutesAsleep", "TotalTimeInBed"])
+    elif minute_sleep_file.exists():
+        queries["sleep"] = (
+            'SELECT "Id", "Date", count_if("value" = 1) AS "TotalMinutesAsleep", count(*) AS "TotalTimeInBed" '
+            f'FROM ({scan_file_sql(minute_sleep_file, ["value"])}) '
+            'WHERE "Date" IS NOT NULL GROUP BY "Id", "Date"'
+        )
+
+    weight_file = folder / "weightLogInfo_merged.csv"
+    if weight_file.exists():
+        queries["weight"] = (
+            'SELECT "Id", "Date", avg("WeightKg") AS "AvgWeightKg", avg("WeightPounds") AS "AvgWeightPounds", '
+            'avg("BMI") AS "AvgBMI" '
+            f'FROM ({scan_file_sql(weight_file, ["WeightKg", "WeightPounds", "BMI"])}) '
+            'WHERE "Date" IS NOT NULL GROUP BY "Id", "Date"'
+        )
+
+    heartrate_file = folder / "heartrate_seconds_merged.csv"
+    if heartrate_file.exists():
+        queries["heartrate"] = (
+            'SELECT "Id", "Date", avg("Value") AS "AvgHeartRate" '
+            f'FROM ({scan_file_sql(heartrate_file, ["Value"])}) '
+            'WHERE "Date" IS NOT NULL GROUP BY "Id", "Date"'
+        )
+
+    return queries
+
+def build_merge_query(raw_data_dir: Path, keep_datetime: bool = False) -> str:
+    """
+    Builds the SQL of the merged dataset, as merge_all_data does. Rows are ordered by
+    period, Id and Date so results are deterministic (the pandas merge keeps file order,
+    which is the same for sorted exports).
+
+    Args:
+        raw_data_dir (Path): Directory holding the period folders.
+        keep_datetime (bool): If True, 'Date' is a timestamp instead of a 'yyyy-mm-dd' string.
+
+    Returns:
+        str: SQL query.
+    """
+    periods = [build_period_queries(folder) for folder in list_period_folders(raw_data_dir)]
+
+    def union_table(name: str) -> str:
+        queries = [f"SELECT *, {position} AS period FROM ({tables[name]})"
+                   for position, tables in enumerate(periods) if name in tables]
+        if not queries:
+            raise KeyError(f"No '{name}' data was found in any period")
+
+        return " UNION ALL BY NAME ".join(queries)
+
+    date_expr = 'CAST(a."Date" AS TIMESTAMP)' if keep_datetime else "strftime(a.\"Date\", '%Y-%m-%d')"
+
+    return f"""
+        WITH activity AS ({union_table("activity")}),
+             sleep AS ({union_table("sleep")}),
+             weight AS ({union_table("weight")}),
+             heartrate AS ({union_table("heartrate")})
+        SELECT
+            a."Id", {date_expr} AS "Date", a.* EXCLUDE ("Id", "Date", period),
+            s."TotalMinutesAsleep", s."TotalTimeInBed",
+            w."AvgWeightKg", w."AvgWeightPounds", w."AvgBMI",
+            h."AvgHeartRate"
+        FROM activity a
+        LEFT JOIN sleep s ON a."Id" = s."Id" AND a."Date" = s."Date"
+        LEFT JOIN weight w ON a."Id" = w."Id" AND a."Date" = w."Date"
+        LEFT JOIN heartrate h ON a."Id" = h."Id" AND a."Date" = h."Date"
+        ORDER BY a.period, a."Id", a."Date", s.period, s."TotalMinutesAsleep", s."TotalTimeInBed"
+    """
+
+@instrument_step
+def run_duckdb_merge(raw_data_dir: Optional[Path] = None, keep_datetime: bool = False,
+                     threads: Optional[int] = None, memory_limit: Optional[str] = None,
+                     temp_directory: Optional[Path] = None) -> pd.DataFrame:
+    """
+    Converts the raw files to daily tables and merges them with DuckDB, reading the files in place.
+
+    Args:
+        raw_data_dir (Path): Directory holding the period folders. Defaults to RAW_DATA_DIR.
+        keep_datetime (bool): If True, 'Date' is returned as datetime64 days instead of
+            'yyyy-mm-dd' strings.
+        threads (int): Number of DuckDB threads. Defaults to all cores.
+        memory_limit (str): DuckDB memory limit (e.g. '4GB'). Defaults to 80% of RAM.
+        temp_directory (Path): Directory DuckDB spills to when over the memory limit.
+
+    Returns:
+        pd.DataFrame: The merged dataset, as merge_all_data returns it.
+    """
+    require_duckdb()
+
+    # The query sorts its output, so scans need not keep insertion order (which costs memory)
+    config = {"preserve_insertion_order": False}
+    if threads is not None:
+        config["threads"] = threads
+    if memory_limit is not None:
+        config["memory_limit"] = memory_limit
+    if temp_directory is not None:
+        config["temp_directory"] = str(temp_directory)
+
+    with duckdb.connect(config=config) as connection:
+        merged_df = connection.sql(build_merge_query(raw_data_dir or RAW_DATA_DIR, keep_datetime)).df()
+
+    if keep_datetime:
+        merged_df["Date"] = merged_df["Date"].astype("datetime64[ns]")
+
+    # Nullable integers come back as pandas' Int64; pandas' own merge holds them as float64
+    nullable_cols = [col for col, dtype in merged_df.dtypes.items() if isinstance(dtype, pd.api.extensions.ExtensionDtype)
+                     and pd.api.types.is_integer_dtype(dtype)]
+    if nullable_cols:
+        merged_df[nullable_cols] = merged_df[nullable_cols].astype("float64")
+
+    return merged_df
@@ -0,0 +1,183 @@
+"""Fitbit Figure Cache Script.
+
+This script:
+1. Keys rendered figures by content: a hash of the exact columns a figure reads, its
+   parameters, its file format and the code and library versions that draw it.
+2. Stores rendered PNG or SVG files next to a JSON manifest, and serves them on a hit
+   so the figure is not rendered again.
+3. Counts hits, misses and evictions for the current process.
+4. Keeps the cache under a size cap by evicting the least recently used figures.
+
+"""
+
+import hashlib
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+import matplotlib
+import pandas as pd
+import seaborn as sns
+from data_cache import CACHE_DIR, evict_entries, hash_file, read_manifest, remove_entry
+
+# Constants
+
+# Directory holding the cached figures and their manifests
+FIGURE_CACHE_DIR = CACHE_DIR / "figures"
+
+# Maximum total size of the cached figure files (256 MB)
+FIGURE_CACHE_SIZE_LIMIT_BYTES = 256 * 1024 ** 2
+
+# Cache statistics of the current process
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+def hash_columns(df: pd.DataFrame, columns: List[str]) -> str:
+    """Computes a content hash of the given columns, their names, dtypes and order.
+
+    The index is ignored, so the same data read in a different way hashes the same.
+
+    Args:
+        df (pd.DataFrame): The dataset.
+        columns (List[str]): Columns to hash.
+
+    Returns:
+        str: Hex digest of the columns' contents.
+    """
+    digest = hashlib.sha256(str(len(df)).encode("utf-8"))
+
+    for col in columns:
+        digest.update(f"{col}|{df[col].dtype}".encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(df[col], index=False).to_numpy().tobytes())
+
+    return digest.hexdigest()
+
+def get_figure_key(name: str, df: pd.DataFrame, columns: List[str], params: Optional[dict] = None,
+                   file_format: str = "png", source_file: Optional[Path] = None) -> str:
+    """Builds the cache key of a figure rendered from the given data and parameters.
+
+    Args:
+        name (str): Figure name.
+        df (pd.DataFrame): The dataset.
+        columns (List[str]): Columns the figure reads.
+        params (dict): Parameters the figure is rendered with (JSON serializable).
+        file_format (str): File format, e.g. 'png' or 'svg'.
+        source_file (Path): Module drawing the figure, so editing it invalidates its figures.
+
+    Returns:
+        str: Cache key used to name the entry's figure and manifest files.
+    """
+    source = {
+        "name": name,
+        "data": hash_columns(df, columns),
+        "params": params or {},
+        "format": file_format,
+        "code": hash_file(source_file) if source_file is not None else None,
+        "versions": [matplotlib.__version__, sns.__version__],
+    }
+
+    return hashlib.sha256(json.dumps(source, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:24]
+
+def remove_figure(key: str, cache_dir: Path = FIGURE_CACHE_DIR) -> None:
+    """Deletes a cached figure and its manifest.
+
+    Args:
+        key (str): Cache key of the figure.
+        cache_dir (Path): Figure cache directory.
+    """
+    manifest = read_manifest(cache_dir / f"{key}.json")
+    remove_entry(key, cache_dir, manifest["format"] if manifest is not None else "")
+
+def load_cached_figure(key: str, save_path: Path, cache_dir: Path = FIGURE_CACHE_DIR) -> bool:
+    """Copies a cached figure to save_path if the cache holds it.
+
+    Args:
+        key (str): Cache key of the figure.
+        save_path (Path): File receiving the figure.
+        cache_dir (Path): Figure cache directory.
+
+    Returns:
+        bool: True on a hit, False on a miss.
+    """
+    manifest_file = cache_dir / f"{key}.json"
+    manifest = read_manifest(manifest_file)
+    cache_file = cache_dir / f"{key}.{manifest['format']}" if manifest is not None else None
+
+    if cache_file is None or not cache_file.exists():
+        _stats["misses"] += 1
+        return False
+
+    shutil.copyfile(cache_file, save_path)
+
+    # Record the access for LRU eviction
+    manifest["last_used"] = time.time()
+    manifest_file.write_text(json.dumps(manifest))
+
+    _stats["hits"] += 1
+    return True
+
+def store_cached_figure(key: str, figure_file: Path, name: str = "", cache_dir: Path = FIGURE_CACHE_DIR) -> None:
+    """Stores a rendered figure file next to a manifest.
+
+    Args:
+        key (str): Cache key of the figure.
+        figure_file (Path): Rendered figure; its suffix gives the format.
+        name (str): Figure name, for reference.
+        cache_dir (Path): Figure cache directory.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    file_format = figure_file.suffix.lstrip(".")
+    cache_file = cache_dir / f"{key}.{file_format}"
+    shutil.copyfile(figure_file, cache_file)
+
+    manifest = {
+        "name": name,
+        "format": file_format,
+        "bytes": cache_file.stat().st_size,
+        "created": time.time(),
+        "last_used": time.time(),
+    }
+    (cache_dir / f"{key}.json").write_text(json.dumps(manifest))
+
+    _stats["stores"] += 1
+
+def evict_cached_figures(size_limit: int = FIGURE_CACHE_SIZE_LIMIT_BYTES, cache_dir: Path = FIGURE_CACHE_DIR) -> int:
+    """Evicts least recently used figures until the cache fits within the size limit.
+
+    Args:
+        size_limit (int): Maximum total size of cached figure files in bytes.
+        cache_dir (Path): Figure cache directory.
+
+    Returns:
+        int: Number of evicted figures.
+    """
+    evicted = evict_entries(size_limit, cache_dir, get_suffix=lambda manifest: manifest["format"], label="figures")
+
+    _stats["evictions"] += evicted
+    return evicted
+
+def get_figure_cache_stats(cache_dir: Path = FIGURE_CACHE_DIR) -> Dict[str, float]:
+    """Returns the current process's hit, miss, store and eviction counts, and the cache's size.
+
+    Args:
+        cache_dir (Path): Figure cache directory.
+
+    Returns:
+        Dict[str, float]: Counts, hit rate, number of cached figures and their total bytes.
+    """
+    manifests = [read_manifest(file) for file in cache_dir.glob("*.json")] if cache_dir.exists() else []
+    manifests = [manifest for manifest in manifests if manifest is not None]
+    lookups = _stats["hits"] + _stats["misses"]
+
+    return {
+        **_stats,
+        "hit_rate": _stats["hits"] / lookups if lookups else 0.0,
+        "entries": len(manifests),
+        "bytes": sum(manifest["bytes"] for manifest in manifests),
+    }
+
+def reset_figure_cache_stats() -> None:
+    """Resets the current process's cache statistics."""
+    for name in _stats:
+        _stats[name] = 0
@@ -0,0 +1,339 @@
+"""Fitbit Incremental Ingestion Script.
+
+This script:
+1. Discovers every Fitabase export period folder under the raw data directory.
+2. Fingerprints each period's raw files and detects new, changed and removed periods.
+3. Reprocesses only those periods into daily tables, stored as Parquet partitioned by period.
+4. Re-merges only the days those periods cover into a merged store partitioned by day.
+5. Cleans the merged store into the final dataset.
+
+Merging joins rows on (Id, Date), so a day's merged rows only depend on the daily rows
+of that day and every affected day can be rebuilt on its own. Cleaning uses statistics
+over the whole dataset (per-user means, IQR bounds), so it runs on the full merged
+store, which is already at daily granularity.
+
+"""
+
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import pandas as pd
+from data_cache import fingerprint_file
+from data_processing import (
+    HEARTRATE_SECONDS_FILE, KEEP_FILES, OUTPUT_FILE, PRE_CLEANED_FILE, PROCESSED_DATA_DIR, RAW_DATA_DIR,
+    clean_data, convert_time_data_to_daily, get_period_suffix, list_period_folders, read_schema_csv,
+    standardize_date_format, stream_heartrate_to_daily
+)
+from instrumentation import instrument_step
+
+# Constants
+
+# Directory holding the incremental store (state, daily tables and merged days)
+INCREMENTAL_DIR = PROCESSED_DATA_DIR / "incremental"
+
+# Daily tables built per period and the file stem each comes from, in the order they are
+# merged onto the activity table
+DAILY_TABLES = {
+    "activity": "dailyActivity_merged",
+    "sleep": "sleepDay_merged",
+    "weight": "weightLogInfo_merged",
+    "heartrate": "heartrateDay_merged",
+}
+
+# Columns each daily table adds to the merged dataset that clean_data relies on
+MERGED_TABLE_COLUMNS = {
+    "activity": ["Id", "Date", "TotalSteps", "Calories", "TotalDistance"],
+    "sleep": ["TotalMinutesAsleep", "TotalTimeInBed"],
+    "weight": ["AvgWeightKg", "AvgBMI"],
+    "heartrate": ["AvgHeartRate"],
+}
+
+# Partition name of merged rows whose Date could not be parsed
+MISSING_DATE_PARTITION = "missing"
+
+def fingerprint_period(folder: Path, previous: Optional[dict] = None) -> Dict[str, dict]:
+    """Fingerprints the relevant raw files of a period by size, modification time and content hash.
+
+    Files whose size and modification time match the previous fingerprint reuse its
+    hash instead of being read again.
+
+    Args:
+        folder (Path): Period folder.
+        previous (dict): Previous fingerprints of the period's files, if any.
+
+    Returns:
+        Dict[str, dict]: Fingerprint per file name.
+    """
+    previous = previous or {}
+    fingerprints = {}
+
+    for name in sorted(KEEP_FILES):
+        file = folder / name
+        if not file.exists():
+            continue
+
+        fingerprints[name] = fingerprint_file(file, previous.get(name))
+
+    return fingerprints
+
+def read_state(store_dir: Path = INCREMENTAL_DIR) -> dict:
+    """Reads the incremental store's state (file fingerprints and days per period).
+
+    Args:
+        store_dir (Path): Incremental store directory.
+
+    Returns:
+        dict: The state, or an empty state if the store is new or unreadable.
+    """
+    try:
+        return json.loads((store_dir / "state.json").read_text())
+    except (OSError, ValueError):
+        return {"options": None, "periods": {}}
+
+def load_period(folder: Path, stream_heartrate: bool = False, use_schemas: bool = False) -> Dict[str, pd.DataFrame]:
+    """Loads the relevant files of one period, keyed by file stem.
+
+    Args:
+        folder (Path): Period folder.
+        stream_heartrate (bool): If True, second-level heart rate data is aggregated in chunks.
+        use_schemas (bool): If True, read each file with its declared FILE_SCHEMAS entry.
+
+    Returns:
+        Dict[str, pd.DataFrame]: DataFrames keyed like '<file stem>_period', so that
+            date formats are looked up as in load_data.
+    """
+    dfs = {}
+
+    for name in sorted(KEEP_FILES):
+        file = folder / name
+        if not file.exists():
+            continue
+
+        if stream_heartrate and name == HEARTRATE_SECONDS_FILE:
+            dfs["heartrateDay_merged_period"] = stream_heartrate_to_daily(file, use_schemas=use_schemas)
+        else:
+            dfs[f"{file.stem}_period"] = read_schema_csv(file) if use_schemas else pd.read_csv(file)
+
+    return dfs
+
+def convert_period_to_daily(dfs: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """
+    Converts one period's loaded files into its daily tables with the same steps
+    handle_data_processing uses for the full dataset.
+
+    Args:
+        dfs (Dict[str, pd.DataFrame]): The period's DataFrames, as returned by load_period.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Daily table per name in DAILY_TABLES (missing files are skipped).
+    """
+    standardize_date_format(dfs)
+    convert_time_data_to_daily(dfs)
+
+    tables = {name: dfs[f"{stem}_period"] for name, stem in DAILY_TABLES.items() if f"{stem}_period" in dfs}
+
+    if "sleep" in tables:
+        tables["sleep"] = tables["sleep"].drop(columns=["TotalSleepRecords"], errors="ignore")
+
+    return tables
+
+def get_partition_names(dates: pd.Series) -> pd.Series:
+    """Maps 'yyyy-mm-dd' Date values to merged store partition names."""
+    return dates.fillna(MISSING_DATE_PARTITION).astype(str)
+
+def write_period_tables(slug: str, tables: Dict[str, pd.DataFrame], store_dir: Path = INCREMENTAL_DIR) -> None:
+    """Replaces a period's daily tables in the store.
+
+    Args:
+        slug (str): Period identifier (its key suffix, see get_period_suffix).
+        tables (Dict[str, pd.DataFrame]): Daily tables of the period.
+        store_dir (Path): Incremental store directory.
+    """
+    period_dir = store_dir / "daily" / slug
+    shutil.rmtree(period_dir, ignore_errors=True)
+    period_dir.mkdir(parents=True)
+
+    for name, df in tables.items():
+        df.to_parquet(period_dir / f"{name}.parquet", index=False)
+
+def read_period_tables(slug: str, partitions: Set[str], store_dir: Path = INCREMENTAL_DIR) -> Dict[str, pd.DataFrame]:
+    """Reads the rows of a period's daily tables that fall on the given days.
+
+    Args:
+        slug (str): Period identifier (its key suffix, see get_period_suffix).
+        partitions (Set[str]): Day partitions to keep.
+        store_dir (Path): Incremental store directory.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Filtered daily table per name.
+    """
+    tables = {}
+
+    for file in (store_dir / "daily" / slug).glob("*.parquet"):
+        df = pd.read_parquet(file)
+        tables[file.stem] = df[get_partition_names(df["Date"]).isin(partitions)]
+
+    return tables
+
+def merge_days(partitions: Set[str], period_slugs: List[str], store_dir: Path = INCREMENTAL_DIR) -> None:
+    """
+    Rebuilds the merged store partitions of the given days from the stored daily tables.
+
+    Each table is concatenated across periods in period order and merged onto the
+    activity table exactly as merge_all_data does. Days left without activity rows
+    have their partition removed.
+
+    Args:
+        partitions (Set[str]): Day partitions to rebuild.
+        period_slugs (List[str]): Periods whose daily tables cover those days, oldest first.
+        store_dir (Path): Incremental store directory.
+    """
+    merged_dir = store_dir / "merged"
+    merged_dir.mkdir(parents=True, exist_ok=True)
+
+    period_tables = [read_period_tables(slug, partitions, store_dir) for slug in period_slugs]
+
+    data = {}
+    for name in DAILY_TABLES:
+        frames = [tables[name] for tables in period_tables if name in tables]
+        if frames:
+            data[name] = pd.concat(frames, ignore_index=True)
+
+    merged_df = data.get("activity", pd.DataFrame(columns=["Id", "Date"]))
+    for name in list(DAILY_TABLES)[1:]:
+        if name in data:
+            merged_df = merged_df.merge(data[name], on=["Id", "Date"], how="left")
+
+    day_partitions = get_partition_names(merged_df["Date"])
+
+    for partition in partitions:
+        file = merged_dir / f"{partition}.parquet"
+        day_df = merged_df[day_partitions == partition]
+
+        if day_df.empty:
+            file.unlink(missing_ok=True)
+        else:
+            day_df.to_parquet(file, index=False)
+
+def read_merged_store(store_dir: Path = INCREMENTAL_DIR) -> pd.DataFrame:
+    """Reads every day partition of the merged store, in day order.
+
+    Args:
+        store_dir (Path): Incremental store directory.
+
+    Returns:
+        pd.DataFrame: The merged, pre-cleaned dataset.
+    """
+    files = sorted((store_dir / "merged").glob("*.parquet"))
+    if not files:
+        return pd.DataFrame()
+
+    return pd.concat([pd.read_parquet(file) for file in files], ignore_index=True)
+
+def check_merged_store(merged_df: pd.DataFrame, store_dir: Path = INCREMENTAL_DIR) -> None:
+    """Checks that the merged store holds rows and every daily table's columns before cleaning.
+
+    Args:
+        merged_df (pd.DataFrame): The merged store, from read_merged_store.
+        store_dir (Path): Incremental store directory, for the error message.
+
+    Raises:
+        KeyError: If the store is empty or a daily table is missing from every period.
+    """
+    missing = [name for name, columns in MERGED_TABLE_COLUMNS.items()
+               if not set(columns).issubset(merged_df.columns)]
+
+    if merged_df.empty or missing:
+        tables = missing or list(DAILY_TABLES)
+        stems = ", ".join(f"'{DAILY_TABLES[name]}'" for name in tables)
+        raise KeyError(f"No {stems} data was found for any period in the incremental store {store_dir}")
+
+@instrument_step
+def run_incremental_update(raw_data_dir: Optional[Path] = None, store_dir: Path = INCREMENTAL_DIR,
+                           stream_heartrate: bool = False, use_schemas: bool = False,
+                           export_csv: bool = True) -> pd.DataFrame:
+    """
+    Brings the incremental store up to date with the raw data and returns the cleaned dataset.
+
+    Only new or changed periods are loaded and converted, and only the days they cover
+    (before and after the change) are re-merged. Removed periods are dropped from the
+    store. Changing the options rebuilds every period.
+
+    Args:
+        raw_data_dir (Path): Directory holding the period folders. Defaults to RAW_DATA_DIR.
+        store_dir (Path): Incremental store directory.
+        stream_heartrate (bool): If True, second-level heart rate data is aggregated in chunks.
+        use_schemas (bool): If True, raw files are read with declared dtypes and columns.
+        export_csv (bool): If True, write the pre-cleaned and cleaned datasets as CSV.
+
+    Returns:
+        pd.DataFrame: Fully cleaned dataset ready to be used in data analysis.
+    """
+    raw_data_dir = raw_data_dir or RAW_DATA_DIR
+
+    state = read_state(store_dir)
+    options = {"stream_heartrate": stream_heartrate, "use_schemas": use_schemas}
+
+    if state["options"] != options:
+        state = {"options": options, "periods": {}}
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+    folders = list_period_folders(raw_data_dir)
+    current_slugs = [get_period_suffix(folder) for folder in folders]
+
+    affected: Set[str] = set()
+
+    # Drop periods whose folder is gone
+    for slug in set(state["periods"]) - set(current_slugs):
+        affected.update(state["periods"].pop(slug)["days"])
+        shutil.rmtree(store_dir / "daily" / slug, ignore_errors=True)
+        logging.info("Removed period %s", slug)
+
+    # Reprocess new and changed periods
+    for folder, slug in zip(folders, current_slugs):
+        known = state["periods"].get(slug)
+        fingerprints = fingerprint_period(folder, known["files"] if known else None)
+
+        if known is not None and known["files"] == fingerprints:
+            continue
+
+        tables = convert_period_to_daily(load_period(folder, stream_heartrate, use_schemas))
+        write_period_tables(slug, tables, store_dir)
+
+        days = set()
+        for df in tables.values():
+            days.update(get_partition_names(df["Date"]).unique())
+
+        affected.update(days)
+        if known is not None:
+            affected.update(known["days"])
+
+        state["periods"][slug] = {"files": fingerprints, "days": sorted(days)}
+        logging.info("%s period %s (%d days)", "Updated" if known else "Added", slug, len(days))
+
+    if affected:
+        # Only periods covering an affected day take part in its merge
+        covering = [slug for slug in current_slugs if affected.intersection(state["periods"][slug]["days"])]
+        merge_days(affected, covering, store_dir)
+
+        store_dir.mkdir(parents=True, exist_ok=True)
+        (store_dir / "state.json").write_text(json.dumps(state, indent=2))
+
+    logging.info("Incremental update re-merged %d days", len(affected))
+
+    merged_df = read_merged_store(store_dir)
+    check_merged_store(merged_df, store_dir)
+
+    if export_csv and affected:
+        PRE_CLEANED_FILE.parent.mkdir(parents=True, exist_ok=True)
+        merged_df.to_csv(PRE_CLEANED_FILE, index=False)
+
+    cleaned_df = clean_data(merged_df)
+
+    if export_csv and (affected or not OUTPUT_FILE.exists()):
+        OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        cleaned_df.to_csv(OUTPUT_FILE, index=False)
+
+    return cleaned_df
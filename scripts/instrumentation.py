@@ -0,0 +1,259 @@
+"""Pipeline Instrumentation Script.
+
+This script:
+1. Provides a decorator that wraps pipeline steps (convert_*, merge_*, handle_*, ...).
+2. Records wall time, CPU time, rows in and out, and DataFrame memory before and after each step.
+3. Emits each record as a structured JSON log line.
+4. Logs a summary table when the outermost instrumented step finishes, so slow or
+   memory-bloating steps stand out.
+
+Instrumentation is off by default and costs one flag check per call until enabled.
+Steps that run in process-pool workers are measured when the pool calls them through
+run_in_worker, which hands the parent's settings to the worker and returns the worker's
+records with the result, so collect_worker_results can add them to the parent's run.
+
+"""
+
+import functools
+import json
+import logging
+import time
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+import pandas as pd
+
+# Logger for the structured step records
+logger = logging.getLogger("pipeline.instrumentation")
+
+# Whether steps are currently measured
+_enabled = False
+
+# Whether memory is measured with memory_usage(deep=True), which also counts string contents
+_deep_memory = False
+
+# Records of the current run, in completion order
+_records: List[dict] = []
+
+# Nesting depth of the step currently running
+_depth = 0
+
+def enable_instrumentation(enabled: bool = True, deep_memory: bool = False) -> None:
+    """Turns step instrumentation on or off and clears previous records.
+
+    Args:
+        enabled (bool): Whether instrumented steps are measured.
+        deep_memory (bool): If True, memory includes the contents of object (string)
+            columns, which is slower to measure.
+    """
+    global _enabled, _deep_memory
+
+    _enabled = enabled
+    _deep_memory = deep_memory
+    _records.clear()
+
+def get_instrumentation_records() -> List[dict]:
+    """Returns the step records of the current or most recent run."""
+    return list(_records)
+
+def get_worker_state() -> dict:
+    """Returns the settings a worker process needs to measure steps as part of the current run.
+
+    Returns:
+        dict: Whether instrumentation is enabled, whether memory is measured deeply, and
+            the nesting depth of the step that starts the workers.
+    """
+    return {"enabled": _enabled, "deep_memory": _deep_memory, "depth": _depth}
+
+def run_in_worker(state: dict, func: Callable, *args) -> Tuple[Any, List[dict]]:
+    """Runs a function in a worker process with the parent's instrumentation settings.
+
+    Pass it to an executor with functools.partial(run_in_worker, get_worker_state(), func).
+    Worker processes do not share the parent's records, so they are returned with the result.
+
+    Args:
+        state (dict): Settings from get_worker_state in the parent process.
+        func (Callable): The function to run.
+        *args: Arguments of func.
+
+    Returns:
+        tuple: (result of func, records of the instrumented steps it ran)
+    """
+    global _enabled, _deep_memory, _depth
+
+    _enabled = state["enabled"]
+    _deep_memory = state["deep_memory"]
+    _depth = state["depth"]
+
+    # A forked worker starts with a copy of the parent's records
+    _records.clear()
+
+    return func(*args), list(_records)
+
+def collect_worker_results(results: Iterable[Tuple[Any, List[dict]]]) -> List[Any]:
+    """Adds the records returned by run_in_worker to the current run and returns the results.
+
+    Args:
+        results (Iterable[tuple]): (result, records) pairs from run_in_worker.
+
+    Returns:
+        List[Any]: The results, in the order of results.
+    """
+    values = []
+
+    for value, records in results:
+        _records.extend(records)
+        values.append(value)
+
+    return values
+
+def frame_stats(obj) -> Tuple[Optional[int], Optional[int]]:
+    """Measures the rows and memory of a step's input or output.
+
+    Args:
+        obj: A DataFrame, a dict of DataFrames, or a tuple whose first item is a DataFrame.
+
+    Returns:
+        tuple: (rows, bytes), or (None, None) if obj holds no DataFrames.
+    """
+    if isinstance(obj, tuple) and obj:
+        obj = obj[0]
+
+    if isinstance(obj, pd.DataFrame):
+        return len(obj), int(obj.memory_usage(index=True, deep=_deep_memory).sum())
+
+    if isinstance(obj, dict):
+        frames = [df for df in obj.values() if isinstance(df, pd.DataFrame)]
+        if frames:
+            return (sum(len(df) for df in frames),
+                    int(sum(df.memory_usage(index=True, deep=_deep_memory).sum() for df in frames)))
+
+    return None, None
+
+def instrument_step(func: Callable) -> Callable:
+    """Decorates a pipeline step so that each call is measured while instrumentation is enabled.
+
+    The step's input is its first argument (a DataFrame or the dfs dict). Steps that
+    modify dfs in-place and return None are measured on that dict after the call.
+
+    Args:
+        func (Callable): The pipeline step.
+
+    Returns:
+        Callable: The wrapped step.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global _depth
+
+        if not _enabled:
+            return func(*args, **kwargs)
+
+        depth = _depth
+
+        # A new outermost step starts a new run
+        if depth == 0:
+            _records.clear()
+
+        step_input = args[0] if args else next(iter(kwargs.values()), None)
+        rows_in, memory_before = frame_stats(step_input)
+
+        _depth += 1
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            _depth -= 1
+
+        wall_seconds = time.perf_counter() - wall_start
+        cpu_seconds = time.process_time() - cpu_start
+
+        rows_out, memory_after = frame_stats(step_input if result is None else result)
+
+        record = {
+            "event": "pipeline_step",
+            "step": func.__name__,
+            "depth": depth,
+            "wall_s": round(wall_seconds, 6),
+            "cpu_s": round(cpu_seconds, 6),
+            "rows_in": rows_in,
+            "rows_out": rows_out,
+            "mem_before_bytes": memory_before,
+            "mem_after_bytes": memory_after,
+            "mem_delta_bytes": (memory_after - memory_before
+                                if memory_before is not None and memory_after is not None else None),
+        }
+        _records.append(record)
+        logger.info(json.dumps(record))
+
+        # The outermost step closes the run
+        if depth == 0:
+            log_instrumentation_summary()
+
+        return result
+
+    return wrapper
+
+def format_bytes(size: Optional[int]) -> str:
+    """Formats a byte count in MB for the summary table."""
+    return "-" if size is None else f"{size / 1024 ** 2:.1f}"
+
+def log_instrumentation_summary() -> None:
+    """Logs a table of all step records, nested steps indented under their caller."""
+    if not _records:
+        return
+
+    total_wall = max(record["wall_s"] for record in _records if record["depth"] == 0)
+
+    lines = [
+        f"{'step':<40} {'wall s':>9} {'cpu s':>9} {'% run':>6} {'rows in':>12} {'rows out':>12} "
+        f"{'MB before':>10} {'MB after':>10}"
+    ]
+
+    for record in order_records_top_down(_records):
+        share = 100 * record["wall_s"] / total_wall if total_wall > 0 else 0
+        rows_in = "-" if record["rows_in"] is None else f"{record['rows_in']:,}"
+        rows_out = "-" if record["rows_out"] is None else f"{record['rows_out']:,}"
+
+        lines.append(
+            f"{'  ' * record['depth'] + record['step']:<40} {record['wall_s']:>9.3f} {record['cpu_s']:>9.3f} "
+            f"{share:>5.1f}% {rows_in:>12} {rows_out:>12} "
+            f"{format_bytes(record['mem_before_bytes']):>10} {format_bytes(record['mem_after_bytes']):>10}"
+        )
+
+    logger.info("Pipeline step summary:\n%s", "\n".join(lines))
+
+def order_records_top_down(records: List[dict]) -> List[dict]:
+    """Orders records so each step comes before the nested steps it called.
+
+    Records are appended as steps complete, so a caller follows its nested steps.
+
+    Args:
+        records (List[dict]): Records in completion order.
+
+    Returns:
+        List[dict]: Records in call order.
+    """
+    ordered: List[dict] = []
+
+    # Completed (record, nested steps) pairs per depth, waiting for their caller
+    pending: List[list] = [[]]
+
+    for record in records:
+        depth = record["depth"]
+
+        while len(pending) <= depth + 1:
+            pending.append([])
+
+        children = pending[depth + 1]
+        pending[depth + 1] = []
+        pending[depth].append([record, children])
+
+    def flatten(items):
+        for record, children in items:
+            ordered.append(record)
+            flatten(children)
+
+    flatten(pending[0])
+
+    return ordered
@@ -5,22 +5,67 @@ This script:
 
 """
 
+import argparse
+from checkpoints import STAGES, run_checkpointed_pipeline
 from data_processing import handle_data_processing
-from analysis import generate_marketing_visuals
+from incremental import run_incremental_update
+from partitioned import run_partitioned_pipeline
+from analysis import generate_marketing_visuals, render_report_figures
+from instrumentation import enable_instrumentation
 
 def main() -> None:
     """
     Runs the Fitbit data processing and visualization pipeline.
 
     This function:
-    - Calls `handle_data_processing()` to clean and preprocess the dataset.
-    - Calls `generate_marketing_visuals()` to generate key visualizations.
+    - Calls `run_checkpointed_pipeline()` to clean and preprocess the dataset, skipping
+      stages whose checkpoints are still valid.
+      With --incremental, calls `run_incremental_update()` instead, reprocessing only new or
+      changed export periods. With --partitions, calls `run_partitioned_pipeline()` instead,
+      processing Id partitions of the data in a process pool. With --backend polars or duckdb,
+      calls `handle_data_processing()` on that backend instead.
+    - Calls `generate_marketing_visuals()` to generate key visualizations. With --render-figures,
+      calls `render_report_figures()` instead, writing every report figure to reports/images
+      without a display.
 
     Args:
         None.
     """
-    cleaned_df = handle_data_processing()
-    generate_marketing_visuals(cleaned_df)
+    parser = argparse.ArgumentParser(description="Run the Fitbit data processing and visualization pipeline.")
+    parser.add_argument("--instrument", action="store_true",
+                        help="Log per-step timing, rows and memory as JSON lines plus a summary table.")
+    parser.add_argument("--resume-from", choices=STAGES,
+                        help="Start at this stage from the previous stage's checkpoint, recomputing the rest.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reprocess only new or changed export periods and the days they cover.")
+    parser.add_argument("--partitions", type=int,
+                        help="Split the data into this many Id partitions, processed in a process pool.")
+    parser.add_argument("--sketch-error", type=float,
+                        help="With --partitions, compute outlier bounds from quantile sketches with this rank error. "
+                             "The bounds follow the same column-by-column semantics as the exact ones, but are "
+                             "approximate, so a few more or fewer rows may be kept.")
+    parser.add_argument("--backend", choices=["pandas", "polars", "duckdb"], default="pandas",
+                        help="Execution backend; polars runs the pipeline as one lazy query (requires polars), "
+                             "duckdb converts and merges the raw files in place (requires duckdb).")
+    parser.add_argument("--render-figures", action="store_true",
+                        help="Render every report figure headlessly to reports/images in a process pool.")
+    args = parser.parse_args()
+
+    enable_instrumentation(args.instrument)
+
+    if args.incremental:
+        cleaned_df = run_incremental_update()
+    elif args.backend != "pandas":
+        cleaned_df = handle_data_processing(backend=args.backend)
+    elif args.partitions:
+        cleaned_df = run_partitioned_pipeline(n_partitions=args.partitions, sketch_error=args.sketch_error)
+    else:
+        cleaned_df = run_checkpointed_pipeline(resume_from=args.resume_from)
+
+    if args.render_figures:
+        render_report_figures(cleaned_df)
+    else:
+        generate_marketing_visuals(cleaned_df)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,298 @@
+"""Fitbit Partitioned Pipeline Script.
+
+This script:
+1. Hash-partitions every relevant raw file by user Id, streaming each file in chunks.
+2. Runs the daily conversion, merge and cleaning of each partition in a process pool.
+3. Computes the global statistics of cleaning from per-partition partial results:
+   the Calories per step ratio from partial sums, and the IQR outlier bounds from the
+   outlier columns of every partition (or from merged quantile sketches of them, one
+   column at a time, since each column's bounds depend on the bounds before it).
+4. Combines the cleaned partitions into the final dataset.
+
+Every other step only looks at one row or one user at a time, and all rows of a user
+land in the same partition, so the result equals handle_data_processing up to row order.
+Partitions are spilled to Parquet between passes, so only one partition per worker,
+plus the outlier columns (or their fixed-size sketches), needs to fit in memory.
+
+"""
+
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from data_processing import (
+    CLEANING_STEPS, HEARTRATE_CHUNK_SIZE, OUTLIER_COLUMNS, RAW_DATA_DIR, build_outlier_mask, categorize_files,
+    compute_outlier_bounds, convert_time_data_to_daily, flag_weight_tracking, get_period_suffix,
+    handle_duplicates, handle_missing_values, handle_outliers, list_all_files, load_data,
+    merge_all_data, restore_default_dtypes, standardize_date_format
+)
+from instrumentation import collect_worker_results, get_worker_state, instrument_step, run_in_worker
+from quantile_sketch import KLLSketch, sketch_outlier_bounds
+
+# Constants
+
+# Default number of Id partitions
+DEFAULT_PARTITIONS = 8
+
+# Cleaning steps that run after the outlier bounds are known
+STEPS_AFTER_OUTLIERS = CLEANING_STEPS[CLEANING_STEPS.index(handle_outliers) + 1:]
+
+# Column dtypes of a streamed daily heart rate frame, which has no raw file of its own
+HEARTRATE_DAY_DTYPES = {"Id": "int64", "AvgHeartRate": "float64"}
+
+def get_partition_dir(partition_root: Path, partition: int) -> Path:
+    """Returns the raw data directory of one partition."""
+    return partition_root / f"part-{partition:04d}"
+
+def assign_partitions(ids: pd.Series, n_partitions: int) -> np.ndarray:
+    """Hashes user Ids to partition numbers.
+
+    Args:
+        ids (pd.Series): Integer user Ids.
+        n_partitions (int): Number of partitions.
+
+    Returns:
+        np.ndarray: Partition number per row.
+    """
+    return pd.util.hash_array(ids.to_numpy(dtype="int64")) % np.uint64(n_partitions)
+
+def partition_raw_files(raw_data_dir: Path, partition_root: Path, n_partitions: int,
+                        chunksize: int = HEARTRATE_CHUNK_SIZE) -> Dict[str, Dict[str, str]]:
+    """
+    Splits every relevant raw file into one CSV per partition, keeping the period folder layout.
+
+    Files are read in chunks, so memory stays bounded by the chunk size. Every partition
+    gets every file, header-only if it holds none of the file's rows.
+
+    Args:
+        raw_data_dir (Path): Directory holding the period folders.
+        partition_root (Path): Directory receiving one raw data directory per partition.
+        n_partitions (int): Number of partitions.
+        chunksize (int): Rows read per chunk.
+
+    Returns:
+        Dict[str, Dict[str, str]]: Column dtypes inferred over each whole file, keyed like
+            the DataFrames in load_data, so partitions can be read back with the same dtypes.
+    """
+    files_to_keep, _ = categorize_files(list_all_files(raw_data_dir))
+    file_dtypes = {}
+
+    for file in files_to_keep:
+        targets = [get_partition_dir(partition_root, partition) / file.relative_to(raw_data_dir)
+                   for partition in range(n_partitions)]
+        for target in targets:
+            target.parent.mkdir(parents=True, exist_ok=True)
+
+        dtypes: Dict[str, np.dtype] = {}
+        header_written = False
+
+        for chunk in pd.read_csv(file, chunksize=chunksize):
+            for col, dtype in chunk.dtypes.items():
+                dtypes[col] = dtype if col not in dtypes else np.result_type(dtypes[col], dtype)
+
+            partitions = assign_partitions(chunk["Id"], n_partitions)
+
+            for partition, target in enumerate(targets):
+                rows = chunk[partitions == partition]
+                if header_written and rows.empty:
+                    continue
+
+                rows.to_csv(target, mode="a" if header_written else "w", header=not header_written, index=False)
+
+            header_written = True
+
+        file_dtypes[f"{file.stem}_{get_period_suffix(file.parent)}"] = {col: str(dtype) for col, dtype in dtypes.items()}
+
+    return file_dtypes
+
+def apply_file_dtypes(dfs: Dict[str, pd.DataFrame], file_dtypes: Dict[str, Dict[str, str]]) -> None:
+    """
+    Casts a partition's loaded columns to the dtypes inferred over the whole raw files.
+
+    A partition may hold only whole numbers of a column the full file reads as float,
+    or no rows at all, so its own inference can differ. The date column and columns
+    already read with a FILE_SCHEMAS dtype are left as read.
+
+    Modifies dfs in-place.
+
+    Args:
+        dfs (Dict[str, pd.DataFrame]): The partition's DataFrames, as returned by load_data.
+        file_dtypes (Dict[str, Dict[str, str]]): Column dtypes per key, from partition_raw_files.
+    """
+    for key, df in dfs.items():
+        dtypes = HEARTRATE_DAY_DTYPES if key.startswith("heartrateDay_merged_") else file_dtypes.get(key, {})
+        casts = {}
+
+        for col, dtype in dtypes.items():
+            if col not in df.columns or col == df.columns[1] or dtype == "object":
+                continue
+
+            current = df[col].dtype
+
+            # Empty partitions read every column as object; integer columns may be float overall
+            if (df.empty and current == "object") or (pd.api.types.is_integer_dtype(current) and dtype == "float64"):
+                casts[col] = dtype
+
+        if casts:
+            dfs[key] = df.astype(casts)
+
+def merge_partition(partition_dir: Path, spill_file: Path, file_dtypes: Dict[str, Dict[str, str]],
+                    options: dict) -> Tuple[float, float]:
+    """
+    First pass over a partition: loads, converts and merges it, then removes duplicates.
+
+    Args:
+        partition_dir (Path): Raw data directory of the partition.
+        spill_file (Path): Parquet file receiving the partition's merged rows.
+        file_dtypes (Dict[str, Dict[str, str]]): Column dtypes per key, from partition_raw_files.
+        options (dict): Pipeline options, named as in handle_data_processing.
+
+    Returns:
+        tuple: (Calories sum, TotalSteps sum) over the rows where both are present.
+    """
+    dfs = load_data(stream_heartrate=options.get("stream_heartrate", False),
+                    use_schemas=options.get("use_schemas", False), raw_data_dir=partition_dir)
+    apply_file_dtypes(dfs, file_dtypes)
+
+    standardize_date_format(dfs, keep_datetime=options.get("keep_datetime", False))
+    convert_time_data_to_daily(dfs)
+
+    df = merge_all_data(dfs, use_sorted_merge=options.get("use_sorted_merge", False))
+    df = handle_duplicates(restore_default_dtypes(df))
+    df.to_parquet(spill_file, index=False)
+
+    essential = df.dropna(subset=["TotalSteps", "Calories"])
+
+    return float(essential["Calories"].sum()), float(essential["TotalSteps"].sum())
+
+def fill_partition(spill_file: Path, calories_per_step: float, collect_columns: bool = True) -> Optional[pd.DataFrame]:
+    """
+    Second pass over a partition: handles missing values with the global Calories per step
+    ratio and flags weight tracking.
+
+    Args:
+        spill_file (Path): Parquet file of the partition, rewritten in place.
+        calories_per_step (float): Calories per step ratio of the whole dataset.
+        collect_columns (bool): If True, return the partition's outlier columns.
+
+    Returns:
+        pd.DataFrame: The partition's OUTLIER_COLUMNS, for the global outlier bounds
+            (None if collect_columns is False).
+    """
+    df = pd.read_parquet(spill_file)
+
+    df = handle_missing_values(df, calories_per_step=calories_per_step)
+    df = flag_weight_tracking(df)
+    df.to_parquet(spill_file, index=False)
+
+    return df[OUTLIER_COLUMNS] if collect_columns else None
+
+def sketch_partition_column(spill_file: Path, bounds: Dict[str, Tuple[float, float]], col: str,
+                            sketch_error: float, seed: int = 0) -> KLLSketch:
+    """
+    Sketches one outlier column of a partition, over the rows within the bounds of the
+    outlier columns before it.
+
+    Args:
+        spill_file (Path): Parquet file of the partition.
+        bounds (Dict[str, Tuple[float, float]]): Global bounds of the preceding outlier columns.
+        col (str): Column to sketch.
+        sketch_error (float): Normalized rank error of the sketch.
+        seed (int): Seed of the partition's sketch.
+
+    Returns:
+        KLLSketch: Sketch of the column's remaining values.
+    """
+    df = pd.read_parquet(spill_file, columns=[*bounds, col])
+
+    if bounds:
+        df = df[build_outlier_mask(df, bounds)]
+
+    return KLLSketch.from_error(sketch_error, seed).update(df[col])
+
+def finish_partition(spill_file: Path, bounds: Dict[str, Tuple[float, float]]) -> None:
+    """
+    Last pass over a partition: removes outliers with the global bounds and runs the
+    remaining cleaning steps.
+
+    Args:
+        spill_file (Path): Parquet file of the partition, rewritten in place.
+        bounds (Dict[str, Tuple[float, float]]): Outlier bounds of the whole dataset.
+    """
+    df = pd.read_parquet(spill_file)
+
+    df = handle_outliers(df, bounds=bounds)
+    for step in STEPS_AFTER_OUTLIERS:
+        df = step(df)
+
+    df.to_parquet(spill_file, index=False)
+
+@instrument_step
+def run_partitioned_pipeline(n_partitions: int = DEFAULT_PARTITIONS, max_workers: Optional[int] = None,
+                             raw_data_dir: Optional[Path] = None, work_dir: Optional[Path] = None,
+                             sketch_error: Optional[float] = None, **options) -> pd.DataFrame:
+    """
+    Runs the full data processing pipeline on Id partitions of the raw data in a process pool.
+
+    Args:
+        n_partitions (int): Number of Id partitions.
+        max_workers (int): Number of worker processes. Defaults to the number of CPUs.
+        raw_data_dir (Path): Directory holding the period folders. Defaults to RAW_DATA_DIR.
+        work_dir (Path): Directory for the partitioned inputs and spilled partitions
+            (a temporary directory inside it is removed afterwards). Defaults to the system temp dir.
+        sketch_error (float): If given, outlier bounds come from merged per-partition quantile
+            sketches with this normalized rank error, instead of exact quantiles over the
+            collected outlier columns. Each column takes one more pass over the partitions.
+        **options: stream_heartrate, use_schemas, keep_datetime and use_sorted_merge,
+            as in handle_data_processing.
+
+    Returns:
+        pd.DataFrame: Fully cleaned dataset, in partition order.
+    """
+    raw_data_dir = raw_data_dir or RAW_DATA_DIR
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as temp_dir:
+        partition_root = Path(temp_dir) / "raw"
+        spill_dir = Path(temp_dir) / "spill"
+        spill_dir.mkdir()
+
+        file_dtypes = partition_raw_files(raw_data_dir, partition_root, n_partitions)
+        logging.info("Split raw files into %d partitions", n_partitions)
+
+        partition_dirs = [get_partition_dir(partition_root, partition) for partition in range(n_partitions)]
+        spill_files = [spill_dir / f"part-{partition:04d}.parquet" for partition in range(n_partitions)]
+
+        # Workers measure their steps as part of this run and return the records
+        state = get_worker_state()
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            sums = collect_worker_results(executor.map(partial(run_in_worker, state, merge_partition), partition_dirs,
+                                                       spill_files, repeat(file_dtypes), repeat(options)))
+
+            calories_per_step = sum(calories for calories, _ in sums) / sum(steps for _, steps in sums)
+
+            partials = collect_worker_results(executor.map(partial(run_in_worker, state, fill_partition), spill_files,
+                                                           repeat(calories_per_step), repeat(sketch_error is None)))
+
+            if sketch_error is not None:
+                # Each column is sketched over the rows within the bounds of the columns before it
+                def sketch_column(col: str, prior_bounds: Dict[str, Tuple[float, float]]) -> List[KLLSketch]:
+                    return list(executor.map(sketch_partition_column, spill_files, repeat(prior_bounds), repeat(col),
+                                             repeat(sketch_error), range(n_partitions)))
+
+                bounds, _ = sketch_outlier_bounds(sketch_column)
+            else:
+                bounds = compute_outlier_bounds(pd.concat(partials, ignore_index=True))
+            del partials
+
+            collect_worker_results(executor.map(partial(run_in_worker, state, finish_partition), spill_files,
+                                                repeat(bounds)))
+
+        cleaned_df = pd.concat([pd.read_parquet(file) for file in spill_files], ignore_index=True)
+
+    return cleaned_df
@@ -0,0 +1,264 @@
+"""Fitbit Polars Backend Script.
+
+This script:
+1. Builds the whole data processing pipeline (load_data through clean_data) as one lazy Polars query.
+2. Scans the raw CSV files lazily, so only the columns and rows the query needs are read
+   (projection and predicate pushdown).
+3. Runs the query on Polars' multi-threaded engine, optionally in streaming mode.
+4. Returns a pandas DataFrame equal to handle_data_processing's result within tolerance.
+
+Polars is optional: install it with `pip install polars` to use this backend.
+
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+import pandas as pd
+from data_processing import (
+    DAY_FORMAT, FILE_SCHEMAS, HEART_RATE_BOUNDS, OUTLIER_COLUMNS, RAW_DATA_DIR, TIMESTAMP_FORMAT,
+    list_period_folders
+)
+from instrumentation import instrument_step
+
+try:
+    import polars as pl
+    import polars.selectors as cs
+except ImportError:  # Polars is an optional dependency
+    pl = None
+    cs = None
+
+# Constants
+
+# Polars equivalents of the numpy dtypes declared in FILE_SCHEMAS
+POLARS_DTYPES = {
+    "int64": "Int64",
+    "int32": "Int32",
+    "int16": "Int16",
+    "uint8": "UInt8",
+    "float32": "Float32",
+    "float64": "Float64",
+}
+
+# Flag columns excluded from rounding, as in round_decimal_values
+FLAG_COLUMNS = ["Id", "HasSleepData", "HasWeightData", "HasBMIData", "HasHeartRateData"]
+
+def require_polars() -> None:
+    """Raises an ImportError with install instructions if Polars is missing."""
+    if pl is None:
+        raise ImportError("The Polars backend requires polars. Install it with `pip install polars`.")
+
+def scan_file(file: Path, columns: List[str], use_schemas: bool = False) -> "pl.LazyFrame":
+    """
+    Lazily scans the given columns of a raw CSV file and parses its date column to a day.
+
+    The date column is parsed with the file's declared format, falling back to the
+    other Fitabase date format, and renamed to 'Date'.
+
+    Args:
+        file (Path): Raw CSV file.
+        columns (List[str]): Columns to read, the date column included.
+        use_schemas (bool): If True, read columns with their declared FILE_SCHEMAS dtypes.
+
+    Returns:
+        pl.LazyFrame: The scanned columns, with 'Date' as a pl.Date.
+    """
+    schema = FILE_SCHEMAS[file.name]
+    date_col = schema["date_column"]
+
+    overrides = {date_col: pl.String, "Id": pl.Int64}
+    if use_schemas:
+        overrides.update({col: getattr(pl, POLARS_DTYPES[dtype]) for col, dtype in schema["dtype"].items()})
+
+    other_format = DAY_FORMAT if schema["date_format"] == TIMESTAMP_FORMAT else TIMESTAMP_FORMAT
+    raw_date = pl.col(date_col)
+
+    return (
+        pl.scan_csv(file, schema_overrides=overrides)
+        .select(columns)
+        .with_columns(
+            pl.coalesce(
+                raw_date.str.strptime(pl.Datetime, schema["date_format"], strict=False),
+                raw_date.str.strptime(pl.Datetime, other_format, strict=False),
+            ).dt.date().alias(date_col)
+        )
+        .rename({date_col: "Date"} if date_col != "Date" else {})
+    )
+
+def scan_period(folder: Path, use_schemas: bool = False) -> Dict[str, "pl.LazyFrame"]:
+    """
+    Builds the daily activity, sleep, weight and heart rate queries of one period,
+    as convert_time_data_to_daily does.
+
+    Args:
+        folder (Path): Period folder.
+        use_schemas (bool): If True, read columns with their declared FILE_SCHEMAS dtypes.
+
+    Returns:
+        Dict[str, pl.LazyFrame]: Daily query per table name (missing files are skipped).
+    """
+    tables = {}
+    day_keys = ["Id", "Date"]
+
+    activity_file = folder / "dailyActivity_merged.csv"
+    if activity_file.exists():
+        columns = pl.scan_csv(activity_file).collect_schema().names()
+        tables["activity"] = scan_file(activity_file, columns, use_schemas)
+
+    sleep_file = folder / "sleepDay_merged.csv"
+    minute_sleep_file = folder / "minuteSleep_merged.csv"
+    if sleep_file.exists():
+        tables["sleep"] = scan_file(sleep_file, ["Id", "SleepDay", "TotalMinutesAsleep", "TotalTimeInBed"],
+                                    use_schemas)
+    elif minute_sleep_file.exists():
+        tables["sleep"] = (
+            scan_file(minute_sleep_file, ["Id", "date", "value"], use_schemas)
+            .drop_nulls(day_keys)
+            .group_by(day_keys)
+            .agg(
+                TotalMinutesAsleep=(pl.col("value") == 1).sum().cast(pl.Int64),
+                TotalTimeInBed=pl.len().cast(pl.Int64),
+            )
+        )
+
+    weight_file = folder / "weightLogInfo_merged.csv"
+    if weight_file.exists():
+        tables["weight"] = (
+            scan_file(weight_file, ["Id", "Date", "WeightKg", "WeightPounds", "BMI"], use_schemas)
+            .drop_nulls(day_keys)
+            .group_by(day_keys)
+            .agg(
+                AvgWeightKg=pl.col("WeightKg").mean(),
+                AvgWeightPounds=pl.col("WeightPounds").mean(),
+                AvgBMI=pl.col("BMI").mean(),
+            )
+        )
+
+    heartrate_file = folder / "heartrate_seconds_merged.csv"
+    if heartrate_file.exists():
+        tables["heartrate"] = (
+            scan_file(heartrate_file, ["Id", "Time", "Value"], use_schemas)
+            .drop_nulls(day_keys)
+            .group_by(day_keys)
+            .agg(AvgHeartRate=pl.col("Value").mean())
+        )
+
+    return tables
+
+def build_merged_query(raw_data_dir: Path, use_schemas: bool = False) -> "pl.LazyFrame":
+    """
+    Builds the query of the merged dataset: each daily table concatenated over all
+    periods and left-joined onto daily activity, as merge_all_data does.
+
+    Args:
+        raw_data_dir (Path): Directory holding the period folders.
+        use_schemas (bool): If True, read columns with their declared FILE_SCHEMAS dtypes.
+
+    Returns:
+        pl.LazyFrame: The merged, pre-cleaned dataset.
+    """
+    periods = [scan_period(folder, use_schemas) for folder in list_period_folders(raw_data_dir)]
+
+    def concat_table(name: str) -> "pl.LazyFrame":
+        frames = [tables[name] for tables in periods if name in tables]
+        if not frames:
+            raise KeyError(f"No '{name}' data was found in any period")
+
+        return pl.concat(frames, how="vertical_relaxed")
+
+    merged = concat_table("activity")
+    for name in ["sleep", "weight", "heartrate"]:
+        merged = merged.join(concat_table(name), on=["Id", "Date"], how="left", maintain_order="left")
+
+    return merged
+
+def build_cleaning_query(merged: "pl.LazyFrame") -> "pl.LazyFrame":
+    """
+    Applies the steps of clean_data to the merged query.
+
+    Args:
+        merged (pl.LazyFrame): The merged dataset.
+
+    Returns:
+        pl.LazyFrame: The cleaned dataset.
+    """
+    # handle_duplicates
+    df = merged.unique(maintain_order=True)
+
+    # handle_missing_values (the pandas step's Calories-per-step fill is not assigned, so it has no effect)
+    df = (
+        df.drop_nulls(["TotalSteps", "Calories"])
+        .with_columns(HasSleepData=pl.col("TotalMinutesAsleep").is_not_null().cast(pl.Int64))
+        .with_columns([
+            pl.col(col).fill_null(pl.col(col).mean().over("Id"))
+            for col in ["AvgWeightKg", "AvgBMI", "AvgHeartRate"]
+        ])
+    )
+
+    # flag_weight_tracking
+    df = df.with_columns(
+        HasWeightData=pl.col("AvgWeightKg").is_not_null().cast(pl.Int64),
+        HasBMIData=pl.col("AvgBMI").is_not_null().cast(pl.Int64),
+    )
+
+    # handle_outliers: each column's IQR bounds are computed on the rows within the bounds
+    # of the columns before it, as compute_outlier_bounds does by default
+    for col in OUTLIER_COLUMNS:
+        Q1 = pl.col(col).quantile(0.25, interpolation="linear")
+        Q3 = pl.col(col).quantile(0.75, interpolation="linear")
+        IQR = Q3 - Q1
+        df = df.filter(pl.col(col).is_null() | pl.col(col).is_between(Q1 - 1.5 * IQR, Q3 + 1.5 * IQR))
+
+    df = (
+        df.filter(pl.col("AvgHeartRate").is_null() | pl.col("AvgHeartRate").is_between(*HEART_RATE_BOUNDS))
+        .with_columns(HasHeartRateData=pl.col("AvgHeartRate").is_not_null().cast(pl.Int64))
+    )
+
+    # add_derived_metrics
+    df = df.with_columns(
+        SleepEfficiency=pl.when(pl.col("TotalTimeInBed") > 0)
+        .then(pl.col("TotalMinutesAsleep") / pl.col("TotalTimeInBed")),
+        VeryActiveRatio=pl.when(pl.col("TotalDistance") > 0)
+        .then(pl.col("VeryActiveDistance") / pl.col("TotalDistance")),
+    )
+
+    # drop_unnecessary_columns
+    df = df.drop(["SedentaryActiveDistance", "AvgWeightPounds"], strict=False)
+
+    # handle_negative_values
+    numeric = cs.numeric()
+    df = df.with_columns(pl.when(numeric >= 0).then(numeric).name.keep())
+
+    # round_decimal_values
+    df = df.with_columns(cs.float().exclude(FLAG_COLUMNS).round(2))
+
+    return df
+
+@instrument_step
+def run_polars_pipeline(raw_data_dir: Optional[Path] = None, use_schemas: bool = False,
+                        keep_datetime: bool = False, streaming: bool = False) -> pd.DataFrame:
+    """
+    Runs the full data processing pipeline as a single lazy Polars query.
+
+    Args:
+        raw_data_dir (Path): Directory holding the period folders. Defaults to RAW_DATA_DIR.
+        use_schemas (bool): If True, raw columns are read with their declared FILE_SCHEMAS dtypes.
+        keep_datetime (bool): If True, 'Date' is returned as datetime64 days instead of
+            'yyyy-mm-dd' strings.
+        streaming (bool): If True, run the query on Polars' streaming engine, which
+            processes the raw files in batches.
+
+    Returns:
+        pd.DataFrame: Fully cleaned dataset ready to be used in data analysis.
+    """
+    require_polars()
+
+    query = build_cleaning_query(build_merged_query(raw_data_dir or RAW_DATA_DIR, use_schemas))
+
+    if keep_datetime:
+        query = query.with_columns(pl.col("Date").cast(pl.Datetime("ns")))
+    else:
+        query = query.with_columns(pl.col("Date").dt.strftime("%Y-%m-%d"))
+
+    cleaned = query.collect(engine="streaming" if streaming else "auto")
+
+    return cleaned.to_pandas()
@@ -0,0 +1,366 @@
+"""Fitbit Quantile Sketch Script.
+
+This script:
+1. Implements a mergeable KLL quantile sketch with a configurable rank error.
+2. Builds one sketch per outlier column from any chunk or partition of the dataset.
+3. Merges per-chunk sketches and derives the IQR outlier bounds from them, one column at a
+   time over the rows within the bounds of the columns before it, as the exact bounds are.
+4. Reports the sketch bounds and removed rows against the exact computation.
+
+A sketch keeps a few hundred values no matter how many it has seen, so outlier bounds
+can be computed over data that is only ever seen one chunk or partition at a time.
+
+Usage:
+    python scripts/quantile_sketch.py [--error 0.01] [--seed 0]
+
+"""
+
+import argparse
+import math
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from data_processing import (
+    CLEANING_STEPS, OUTLIER_COLUMNS, build_outlier_mask, compute_outlier_bounds, convert_time_data_to_daily,
+    get_iqr_bounds, handle_outliers, load_data, merge_all_data, standardize_date_format
+)
+
+# Constants
+
+# Default normalized rank error of outlier sketches (1%)
+DEFAULT_SKETCH_ERROR = 0.01
+
+# Ratio by which the capacity of each compactor shrinks relative to the one above it
+CAPACITY_DECAY = 2 / 3
+
+# Smallest capacity of any compactor
+MIN_CAPACITY = 2
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch after Karnin, Lang and Liberty (KLL).
+
+    Values are kept in a stack of compactors. Compactor h holds values that each stand
+    for 2**h inputs; when it is full it is sorted and every other value (from a random
+    start) moves up one level. The rank error of any quantile is then about
+    normalized_rank_error * n with high probability, using O(k) memory.
+
+    Until the first compaction the sketch is exact, and quantiles are linearly
+    interpolated like pd.Series.quantile.
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = 0):
+        """
+        Args:
+            k (int): Capacity of the top compactor. Larger k means a smaller error.
+            seed (int): Seed of the random compaction offsets, for reproducible results.
+        """
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_error(cls, error: float, seed: Optional[int] = 0) -> "KLLSketch":
+        """Creates a sketch whose normalized rank error is at most error (e.g. 0.01 for 1%)."""
+        # Empirical single-quantile error of KLL, as used by Apache DataSketches
+        k = math.ceil((2.296 / error) ** (1 / 0.9723))
+
+        return cls(k=max(k, 8), seed=seed)
+
+    @property
+    def normalized_rank_error(self) -> float:
+        """Expected rank error of a quantile, as a fraction of the number of values."""
+        return 2.296 / self.k ** 0.9723
+
+    def capacity(self, level: int) -> int:
+        """Returns how many values the compactor at a level holds before it compacts."""
+        depth = len(self.levels) - level - 1
+
+        return max(MIN_CAPACITY, math.ceil(self.k * CAPACITY_DECAY ** depth))
+
+    def update(self, values: Iterable[float]) -> "KLLSketch":
+        """Adds values to the sketch. Missing values are ignored.
+
+        Args:
+            values (Iterable[float]): Values to add (a Series, array or list).
+
+        Returns:
+            KLLSketch: The sketch itself.
+        """
+        values = np.asarray(values, dtype="float64").ravel()
+        values = values[~np.isnan(values)]
+
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += len(values)
+        self.compress()
+
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Merges another sketch into this one.
+
+        Args:
+            other (KLLSketch): Sketch of other values.
+
+        Returns:
+            KLLSketch: The sketch itself.
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+
+        for level, values in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], values])
+
+        self.k = max(self.k, other.k)
+        self.n += other.n
+        self.compress()
+
+        return self
+
+    def compress(self) -> None:
+        """Compacts the lowest full compactor until every compactor is within capacity."""
+        while True:
+            full = [level for level, values in enumerate(self.levels) if len(values) >= self.capacity(level)]
+            if not full:
+                return
+
+            self.compact(full[0])
+
+    def compact(self, level: int) -> None:
+        """Moves every other sorted value of a compactor up one level, doubling its weight."""
+        if level + 1 == len(self.levels):
+            self.levels.append(np.empty(0))
+
+        values = np.sort(self.levels[level])
+
+        # An odd value out stays behind, so that the total weight is preserved
+        kept = values[len(values) - len(values) % 2:]
+        paired = values[:len(values) - len(values) % 2]
+
+        promoted = paired[self.rng.integers(2)::2]
+
+        self.levels[level] = kept
+        self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Estimates quantiles of the values seen so far.
+
+        Args:
+            qs (Sequence[float]): Quantiles between 0 and 1.
+
+        Returns:
+            np.ndarray: Estimated value per quantile (NaN if the sketch is empty).
+        """
+        qs = np.asarray(qs, dtype="float64")
+
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+
+        # Still exact: interpolate between neighbouring values like pandas does
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], qs)
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_values), 2 ** level)
+                                  for level, level_values in enumerate(self.levels)])
+
+        order = np.argsort(values, kind="stable")
+        cumulative = np.cumsum(weights[order])
+
+        positions = np.searchsorted(cumulative, qs * cumulative[-1], side="left")
+
+        return values[order][np.clip(positions, 0, len(values) - 1)]
+
+    def __len__(self) -> int:
+        """Returns the number of values stored (not seen) by the sketch."""
+        return sum(len(values) for values in self.levels)
+
+def sketch_columns(df: pd.DataFrame, columns: Sequence[str] = OUTLIER_COLUMNS,
+                   error: float = DEFAULT_SKETCH_ERROR, seed: Optional[int] = 0) -> Dict[str, KLLSketch]:
+    """Builds one sketch per column of a chunk or partition of the dataset.
+
+    Args:
+        df (pd.DataFrame): A chunk or partition of the dataset.
+        columns (Sequence[str]): Columns to sketch.
+        error (float): Normalized rank error of each sketch.
+        seed (int): Seed of the compaction offsets (use a different seed per chunk).
+
+    Returns:
+        Dict[str, KLLSketch]: Sketch per column.
+    """
+    return {col: KLLSketch.from_error(error, seed).update(df[col]) for col in columns}
+
+def merge_column_sketches(sketches: Iterable[Dict[str, KLLSketch]], seed: Optional[int] = 0) -> Dict[str, KLLSketch]:
+    """Merges per-chunk column sketches into one new sketch per column.
+
+    The input sketches are left unchanged.
+
+    Args:
+        sketches (Iterable[Dict[str, KLLSketch]]): Column sketches of each chunk.
+        seed (int): Seed of the merged sketches' compaction offsets.
+
+    Returns:
+        Dict[str, KLLSketch]: Merged sketch per column.
+    """
+    merged: Dict[str, KLLSketch] = {}
+
+    for chunk_sketches in sketches:
+        for col, sketch in chunk_sketches.items():
+            if col not in merged:
+                merged[col] = KLLSketch(k=sketch.k, seed=seed)
+            merged[col].merge(sketch)
+
+    return merged
+
+def sketch_outlier_bounds(sketch_column: Callable[[str, Dict[str, Tuple[float, float]]], Iterable[KLLSketch]],
+                          seed: Optional[int] = 0) -> Tuple[Dict[str, Tuple[float, float]], Dict[str, KLLSketch]]:
+    """
+    Computes the IQR outlier bounds from column sketches, as compute_outlier_bounds does
+    from exact quantiles: each column is sketched over the rows within the bounds of the
+    columns before it.
+
+    Args:
+        sketch_column (Callable): Takes a column and the bounds of the columns before it,
+            and returns the sketches of that column's remaining values in each chunk or partition.
+        seed (int): Seed of the merged sketches' compaction offsets.
+
+    Returns:
+        tuple: (lower_bound, upper_bound) per column, and the merged sketch per column.
+    """
+    quartiles = {}
+    sketches = {}
+
+    for col in OUTLIER_COLUMNS:
+        # The bounds of the preceding columns only, without the fixed heart rate range
+        bounds = {prior: limits for prior, limits in get_iqr_bounds(quartiles).items() if prior in quartiles}
+
+        sketches[col] = merge_column_sketches(({col: sketch} for sketch in sketch_column(col, bounds)), seed)[col]
+        quartiles[col] = tuple(sketches[col].quantiles([0.25, 0.75]))
+
+    return get_iqr_bounds(quartiles), sketches
+
+def get_rank_error(values: pd.Series, estimate: float, q: float) -> float:
+    """
+    Measures how far a quantile estimate's rank is from q, as a fraction of the values.
+
+    Ties count in the estimate's favour: any rank between the share of values below it
+    and the share at or below it is exact.
+
+    Args:
+        values (pd.Series): The exact values (without missing values).
+        estimate (float): Estimated q-quantile.
+        q (float): Quantile between 0 and 1.
+
+    Returns:
+        float: Normalized rank error (0 if the estimate is an exact q-quantile).
+    """
+    below = (values < estimate).mean()
+    at_or_below = (values <= estimate).mean()
+
+    return float(max(0.0, below - q, q - at_or_below))
+
+def count_removed(df: pd.DataFrame, col: str, bounds: Tuple[float, float]) -> int:
+    """Counts the rows a single column's bounds would remove."""
+    values = df[col]
+
+    return int((values.notna() & ((values < bounds[0]) | (values > bounds[1]))).sum())
+
+def compare_outlier_bounds(df: pd.DataFrame, error: float = DEFAULT_SKETCH_ERROR, n_chunks: int = 1,
+                           seed: int = 0) -> pd.DataFrame:
+    """
+    Compares the outlier bounds and removed rows of merged sketches against the exact computation.
+
+    The frame is split into n_chunks, sketched chunk by chunk and merged, as a
+    chunked or partitioned run would do, and each column is sketched over the rows within
+    the sketch bounds of the columns before it. The exact bounds are those of
+    compute_outlier_bounds, which the pipeline uses, so the report shows the whole gap.
+
+    Args:
+        df (pd.DataFrame): The dataset as handle_outliers receives it.
+        error (float): Normalized rank error of each sketch.
+        n_chunks (int): Number of chunks sketched separately and merged.
+        seed (int): Seed of the first chunk's sketches.
+
+    Returns:
+        pd.DataFrame: One row per outlier column plus an 'all columns' row with the exact and
+            sketch bounds, the rank error of the sketch quartiles over the values they
+            summarize, and the rows each removes.
+    """
+    exact_bounds = compute_outlier_bounds(df)
+
+    chunks = [df.iloc[rows] for rows in np.array_split(np.arange(len(df)), n_chunks)]
+    sketched_values = {}
+
+    def sketch_column(col: str, bounds: Dict[str, Tuple[float, float]]) -> List[KLLSketch]:
+        kept = [chunk[build_outlier_mask(chunk, bounds)] if bounds else chunk for chunk in chunks]
+        sketched_values[col] = pd.concat([chunk[col] for chunk in kept]).dropna()
+
+        return [KLLSketch.from_error(error, seed + position).update(chunk[col]) for position, chunk in enumerate(kept)]
+
+    sketch_bounds, sketches = sketch_outlier_bounds(sketch_column)
+
+    rows = []
+    for col in OUTLIER_COLUMNS:
+        Q1, Q3 = sketches[col].quantiles([0.25, 0.75])
+
+        rows.append({
+            "column": col,
+            "exact_lower": exact_bounds[col][0],
+            "sketch_lower": sketch_bounds[col][0],
+            "exact_upper": exact_bounds[col][1],
+            "sketch_upper": sketch_bounds[col][1],
+            "q1_rank_error": get_rank_error(sketched_values[col], Q1, 0.25),
+            "q3_rank_error": get_rank_error(sketched_values[col], Q3, 0.75),
+            "exact_removed": count_removed(df, col, exact_bounds[col]),
+            "sketch_removed": count_removed(df, col, sketch_bounds[col]),
+        })
+
+    exact_mask = build_outlier_mask(df, exact_bounds)
+    sketch_mask = build_outlier_mask(df, sketch_bounds)
+
+    rows.append({
+        "column": "all columns",
+        "exact_removed": int((~exact_mask).sum()),
+        "sketch_removed": int((~sketch_mask).sum()),
+    })
+
+    return pd.DataFrame(rows).set_index("column")
+
+def load_outlier_input(raw_data_dir: Optional[Path] = None) -> pd.DataFrame:
+    """
+    Runs the pipeline up to the frame handle_outliers receives.
+
+    Args:
+        raw_data_dir (Path): Directory holding the period folders. Defaults to RAW_DATA_DIR.
+
+    Returns:
+        pd.DataFrame: The merged dataset after the cleaning steps before handle_outliers.
+    """
+    dfs = load_data(raw_data_dir=raw_data_dir)
+    standardize_date_format(dfs)
+    convert_time_data_to_daily(dfs)
+
+    df = merge_all_data(dfs)
+    for step in CLEANING_STEPS[:CLEANING_STEPS.index(handle_outliers)]:
+        df = step(df)
+
+    return df
+
+def main() -> None:
+    """Prints the sketch versus exact outlier bounds report for the raw dataset."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--error", type=float, default=DEFAULT_SKETCH_ERROR, help="Normalized rank error.")
+    parser.add_argument("--chunks", type=int, default=8, help="Chunks sketched separately and merged.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--raw-data-dir", type=Path)
+    args = parser.parse_args()
+
+    report = compare_outlier_bounds(load_outlier_input(args.raw_data_dir), args.error, args.chunks, args.seed)
+
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(report)
+
+if __name__ == "__main__":
+    main()
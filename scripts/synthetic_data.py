@@ -0,0 +1,416 @@
+"""Synthetic Fitabase Data Generator Script.
+
+This script:
+1. Generates realistic daily activity, sleep, heart rate and weight data for any number of users.
+2. Writes it in the same Fitabase export layout (one folder per period) and CSV formats as data/raw.
+3. Produces identical files for identical parameters and seed, so benchmarks are reproducible.
+
+Usage:
+    python scripts/synthetic_data.py OUTPUT_DIR --users 1000 --days 31 --periods 2 --heartrate-samples 1440 --seed 0
+
+"""
+
+import argparse
+import logging
+from pathlib import Path
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+# Constants
+
+# Default number of export periods (as in the Kaggle export)
+DEFAULT_PERIODS = 2
+
+# Default first day of the first period; each later period follows on directly
+START_DATE = pd.Timestamp("2016-03-12")
+
+# Share of users who track each optional metric (close to the Kaggle export)
+SLEEP_TRACKING_SHARE = 0.45
+HEARTRATE_TRACKING_SHARE = 0.43
+WEIGHT_TRACKING_SHARE = 0.12
+
+# Number of users generated and written at a time, bounding memory use
+DEFAULT_BATCH_SIZE = 1_000
+
+def get_period_folder_name(days: pd.DatetimeIndex) -> str:
+    """Names an export period's folder after its date range, as Fitabase does.
+
+    Args:
+        days (pd.DatetimeIndex): Days in the period.
+
+    Returns:
+        str: Folder name (e.g. 'Fitabase Data 3.12.16-4.11.16').
+    """
+    start, end = days[0], days[-1]
+
+    return f"Fitabase Data {start.month}.{start.day}.{start:%y}-{end.month}.{end.day}.{end:%y}"
+
+def user_ids(user_index: np.ndarray) -> np.ndarray:
+    """Maps user numbers to distinct 10-digit Fitbit-style Ids.
+
+    Args:
+        user_index (np.ndarray): User numbers starting at 0.
+
+    Returns:
+        np.ndarray: int64 Ids.
+    """
+    return 1_000_000_000 + user_index.astype(np.int64) * 7
+
+def format_days(days: pd.DatetimeIndex) -> np.ndarray:
+    """Formats days like the Fitabase daily files (e.g. '4/12/2016').
+
+    Args:
+        days (pd.DatetimeIndex): Days to format.
+
+    Returns:
+        np.ndarray: Object array of date strings.
+    """
+    return np.array([f"{day.month}/{day.day}/{day.year}" for day in days], dtype=object)
+
+def format_times_of_day(seconds: np.ndarray) -> np.ndarray:
+    """Formats seconds after midnight like the Fitabase timestamps (e.g. '2:47:30 AM').
+
+    Args:
+        seconds (np.ndarray): Seconds after midnight (0 to 86399).
+
+    Returns:
+        np.ndarray: Object array of time strings.
+    """
+    hours, remainder = np.divmod(seconds, 3600)
+    minutes, secs = np.divmod(remainder, 60)
+
+    return np.array([
+        f"{(hour % 12) or 12}:{minute:02d}:{sec:02d} {'AM' if hour < 12 else 'PM'}"
+        for hour, minute, sec in zip(hours, minutes, secs)
+    ], dtype=object)
+
+def format_timestamps(day_codes: np.ndarray, seconds: np.ndarray, day_strings: np.ndarray) -> np.ndarray:
+    """Formats timestamps, formatting each distinct time of day only once.
+
+    Args:
+        day_codes (np.ndarray): Index into day_strings for each timestamp.
+        seconds (np.ndarray): Seconds after midnight for each timestamp.
+        day_strings (np.ndarray): Formatted days.
+
+    Returns:
+        np.ndarray: Object array of timestamp strings (e.g. '4/12/2016 2:47:30 AM').
+    """
+    second_codes, unique_seconds = pd.factorize(seconds)
+    time_strings = format_times_of_day(unique_seconds)
+
+    return day_strings[day_codes] + " " + time_strings[second_codes]
+
+def generate_user_traits(user_index: np.ndarray, seed: int) -> Dict[str, np.ndarray]:
+    """Draws the per-user characteristics shared by both export periods.
+
+    Args:
+        user_index (np.ndarray): User numbers in this batch.
+        seed (int): Dataset seed.
+
+    Returns:
+        Dict[str, np.ndarray]: Trait arrays aligned with user_index.
+    """
+    rng = np.random.default_rng([seed, int(user_index[0]), 0])
+    n_users = len(user_index)
+
+    weight_kg = rng.normal(74, 14, n_users).clip(45, 140)
+    height_m = rng.normal(1.68, 0.09, n_users).clip(1.45, 1.95)
+
+    return {
+        "Id": user_ids(user_index),
+        "mean_steps": rng.lognormal(np.log(7_000), 0.45, n_users),
+        "stride_km": rng.normal(0.00072, 0.00006, n_users).clip(0.0005, 0.0009),
+        "bmr": 10 * weight_kg + 6.25 * height_m * 100 - 5 * rng.uniform(20, 60, n_users) - 80,
+        "resting_hr": rng.normal(66, 8, n_users).clip(45, 95),
+        "mean_sleep": rng.normal(420, 45, n_users).clip(240, 560),
+        "weight_kg": weight_kg,
+        "bmi": weight_kg / height_m ** 2,
+        "tracks_sleep": rng.random(n_users) < SLEEP_TRACKING_SHARE,
+        "tracks_heartrate": rng.random(n_users) < HEARTRATE_TRACKING_SHARE,
+        "tracks_weight": rng.random(n_users) < WEIGHT_TRACKING_SHARE,
+    }
+
+def generate_daily_activity(traits: Dict[str, np.ndarray], days: pd.DatetimeIndex,
+                            rng: np.random.Generator) -> pd.DataFrame:
+    """Generates 'dailyActivity_merged.csv' rows for a batch of users.
+
+    Args:
+        traits (Dict[str, np.ndarray]): Per-user traits.
+        days (pd.DatetimeIndex): Days in the period.
+        rng (np.random.Generator): Random generator for this batch and period.
+
+    Returns:
+        pd.DataFrame: Daily activity rows.
+    """
+    n_users, n_days = len(traits["Id"]), len(days)
+    shape = (n_users, n_days)
+
+    steps = rng.gamma(4.0, traits["mean_steps"][:, None] / 4.0, shape).round().astype(np.int64)
+
+    # Some days the device is not worn at all
+    steps[rng.random(shape) < 0.05] = 0
+
+    distance = steps * traits["stride_km"][:, None]
+    very_active_share = rng.beta(1.5, 8, shape)
+    moderately_active_share = rng.beta(1.2, 12, shape)
+    light_active_share = 1 - very_active_share - moderately_active_share
+
+    very_active_minutes = (steps * very_active_share / 110).round().astype(np.int64)
+    fairly_active_minutes = (steps * moderately_active_share / 100).round().astype(np.int64)
+    lightly_active_minutes = np.minimum((steps * light_active_share / 40).round(), 600).astype(np.int64)
+    sedentary_minutes = np.maximum(
+        1440 - very_active_minutes - fairly_active_minutes - lightly_active_minutes
+        - (traits["mean_sleep"][:, None] * rng.uniform(0, 1.1, shape)).astype(np.int64),
+        0
+    )
+
+    calories = (traits["bmr"][:, None] * 1.15 + steps * 0.045 + rng.normal(0, 150, shape)).round().astype(np.int64)
+
+    return pd.DataFrame({
+        "Id": np.repeat(traits["Id"], n_days),
+        "ActivityDate": np.tile(format_days(days), n_users),
+        "TotalSteps": steps.ravel(),
+        "TotalDistance": distance.ravel().round(2),
+        "TrackerDistance": distance.ravel().round(2),
+        "LoggedActivitiesDistance": 0.0,
+        "VeryActiveDistance": (distance * very_active_share).ravel().round(2),
+        "ModeratelyActiveDistance": (distance * moderately_active_share).ravel().round(2),
+        "LightActiveDistance": (distance * light_active_share).ravel().round(2),
+        "SedentaryActiveDistance": 0.0,
+        "VeryActiveMinutes": very_active_minutes.ravel(),
+        "FairlyActiveMinutes": fairly_active_minutes.ravel(),
+        "LightlyActiveMinutes": lightly_active_minutes.ravel(),
+        "SedentaryMinutes": sedentary_minutes.ravel(),
+        "Calories": calories.ravel(),
+    })
+
+def generate_minute_sleep(traits: Dict[str, np.ndarray], days: pd.DatetimeIndex,
+                          rng: np.random.Generator) -> pd.DataFrame:
+    """Generates 'minuteSleep_merged.csv' rows (one per minute in bed) for a batch of users.
+
+    Args:
+        traits (Dict[str, np.ndarray]): Per-user traits.
+        days (pd.DatetimeIndex): Days in the period.
+        rng (np.random.Generator): Random generator for this batch and period.
+
+    Returns:
+        pd.DataFrame: Minute-level sleep rows.
+    """
+    sleepers = np.flatnonzero(traits["tracks_sleep"])
+    n_days = len(days)
+
+    # Sleep trackers log most, but not all, nights
+    user_pos, day_pos = np.nonzero(rng.random((len(sleepers), n_days)) < 0.8)
+    user_rows = sleepers[user_pos]
+
+    minutes_in_bed = rng.normal(traits["mean_sleep"][user_rows] * 1.08, 40).clip(60, 780).astype(np.int64)
+
+    # Bedtime between 9 PM and 2 AM, in seconds after the night's start day midnight
+    bedtime = rng.integers(21 * 3600, 26 * 3600, len(user_rows)) // 60 * 60 + 30
+
+    night = np.repeat(np.arange(len(user_rows)), minutes_in_bed)
+    minute_in_night = np.arange(minutes_in_bed.sum()) - np.repeat(np.cumsum(minutes_in_bed) - minutes_in_bed,
+                                                                   minutes_in_bed)
+    absolute_seconds = bedtime[night] + minute_in_night * 60
+    day_offset, seconds = np.divmod(absolute_seconds, 86_400)
+
+    # The final period day's nights can run past its end, so format one extra day
+    all_days = days.append(pd.DatetimeIndex([days[-1] + pd.Timedelta(days=1)]))
+    day_codes = day_pos[night] + day_offset
+
+    return pd.DataFrame({
+        "Id": traits["Id"][user_rows][night],
+        "date": format_timestamps(day_codes, seconds, format_days(all_days)),
+        "value": rng.choice(np.array([1, 2, 3], dtype=np.int64), len(night), p=[0.92, 0.06, 0.02]),
+        "logId": (11_380_000_000 + day_pos.astype(np.int64) * 1_000_000 + traits["Id"][user_rows] % 1_000_000)[night],
+        "_night_day": day_pos[night],
+    })
+
+def summarize_sleep_days(minute_sleep: pd.DataFrame, days: pd.DatetimeIndex) -> pd.DataFrame:
+    """Builds 'sleepDay_merged.csv' rows consistent with the minute-level sleep data.
+
+    Args:
+        minute_sleep (pd.DataFrame): Output of generate_minute_sleep.
+        days (pd.DatetimeIndex): Days in the period.
+
+    Returns:
+        pd.DataFrame: Daily sleep rows.
+    """
+    nights = minute_sleep.assign(asleep=minute_sleep["value"] == 1).groupby(["Id", "_night_day"]).agg(
+        TotalMinutesAsleep=("asleep", "sum"),
+        TotalTimeInBed=("asleep", "size"),
+    ).reset_index()
+
+    day_strings = format_days(days) + " 12:00:00 AM"
+
+    return pd.DataFrame({
+        "Id": nights["Id"],
+        "SleepDay": day_strings[nights["_night_day"].to_numpy()],
+        "TotalSleepRecords": 1,
+        "TotalMinutesAsleep": nights["TotalMinutesAsleep"],
+        "TotalTimeInBed": nights["TotalTimeInBed"],
+    })
+
+def generate_heartrate_seconds(traits: Dict[str, np.ndarray], days: pd.DatetimeIndex, samples_per_day: int,
+                               rng: np.random.Generator) -> pd.DataFrame:
+    """Generates 'heartrate_seconds_merged.csv' rows for a batch of users.
+
+    Args:
+        traits (Dict[str, np.ndarray]): Per-user traits.
+        days (pd.DatetimeIndex): Days in the period.
+        samples_per_day (int): Heart rate readings per user per day (at most 86400).
+        rng (np.random.Generator): Random generator for this batch and period.
+
+    Returns:
+        pd.DataFrame: Second-level heart rate rows.
+    """
+    trackers = np.flatnonzero(traits["tracks_heartrate"])
+    n_days = len(days)
+    samples_per_day = min(samples_per_day, 86_400)
+
+    # Readings spread evenly over the day with a little jitter, sorted within each day
+    spacing = 86_400 // samples_per_day
+    base_seconds = np.arange(samples_per_day) * spacing
+    n_rows = len(trackers) * n_days * samples_per_day
+
+    seconds = np.tile(base_seconds, len(trackers) * n_days) + rng.integers(0, max(spacing, 1), n_rows)
+    user_rows = np.repeat(trackers, n_days * samples_per_day)
+    day_codes = np.tile(np.repeat(np.arange(n_days), samples_per_day), len(trackers))
+
+    # Heart rate rises during the day and with random activity bursts
+    daytime = np.sin(np.pi * seconds / 86_400)
+    value = traits["resting_hr"][user_rows] + 18 * daytime + rng.gamma(1.5, 6, n_rows)
+
+    return pd.DataFrame({
+        "Id": traits["Id"][user_rows],
+        "Time": format_timestamps(day_codes, seconds, format_days(days)),
+        "Value": value.round().clip(38, 200).astype(np.int64),
+    })
+
+def generate_weight_log(traits: Dict[str, np.ndarray], days: pd.DatetimeIndex,
+                        rng: np.random.Generator) -> pd.DataFrame:
+    """Generates 'weightLogInfo_merged.csv' rows for a batch of users.
+
+    Args:
+        traits (Dict[str, np.ndarray]): Per-user traits.
+        days (pd.DatetimeIndex): Days in the period.
+        rng (np.random.Generator): Random generator for this batch and period.
+
+    Returns:
+        pd.DataFrame: Weight log rows.
+    """
+    weighers = np.flatnonzero(traits["tracks_weight"])
+
+    # Weight is logged on a minority of days
+    user_pos, day_pos = np.nonzero(rng.random((len(weighers), len(days))) < 0.25)
+    user_rows = weighers[user_pos]
+
+    weight_kg = traits["weight_kg"][user_rows] + rng.normal(0, 0.6, len(user_rows))
+    bmi = traits["bmi"][user_rows] * weight_kg / traits["weight_kg"][user_rows]
+    is_manual = rng.random(len(user_rows)) < 0.6
+
+    # Manual entries are logged at the end of the day, scale readings in the morning
+    seconds = np.where(is_manual, 86_399, rng.integers(6 * 3600, 9 * 3600, len(user_rows)))
+
+    return pd.DataFrame({
+        "Id": traits["Id"][user_rows],
+        "Date": format_timestamps(day_pos, seconds, format_days(days)),
+        "WeightKg": weight_kg.round(6),
+        "WeightPounds": (weight_kg * 2.20462262).round(6),
+        "Fat": np.where(rng.random(len(user_rows)) < 0.05, rng.normal(25, 4, len(user_rows)).round(), np.nan),
+        "BMI": bmi.round(6),
+        "IsManualReport": np.where(is_manual, "True", "False"),
+        "LogId": 1_460_000_000_000 + day_pos.astype(np.int64) * 86_400_000 + seconds * 1_000,
+    })
+
+def write_synthetic_dataset(output_dir: Path, n_users: int, n_days: int = 31, heartrate_samples_per_day: int = 1440,
+                            seed: int = 0, batch_size: int = DEFAULT_BATCH_SIZE, n_periods: int = DEFAULT_PERIODS,
+                            start_date: pd.Timestamp = START_DATE) -> List[Path]:
+    """Writes a synthetic Fitabase export in the folder-per-period layout used by data/raw.
+
+    Each period folder is named after the date range it covers, so the period start
+    dates parsed by data_processing match the generated data.
+
+    Users are generated and appended to the CSV files one batch at a time, so memory
+    use is bounded by the batch size rather than the number of users. The same
+    parameters and seed always produce the same files.
+
+    Args:
+        output_dir (Path): Directory to create the period folders in.
+        n_users (int): Number of users.
+        n_days (int): Number of days in each export period.
+        heartrate_samples_per_day (int): Heart rate readings per tracking user per day.
+        seed (int): Random seed.
+        batch_size (int): Number of users generated at a time.
+        n_periods (int): Number of consecutive export periods.
+        start_date (pd.Timestamp): First day of the first period.
+
+    Returns:
+        List[Path]: Paths of the written CSV files.
+    """
+    written = []
+
+    for period in range(n_periods):
+        days = pd.date_range(pd.Timestamp(start_date) + pd.Timedelta(days=period * n_days), periods=n_days)
+
+        folder = output_dir / get_period_folder_name(days)
+        folder.mkdir(parents=True, exist_ok=True)
+        files = {
+            "dailyActivity_merged.csv": folder / "dailyActivity_merged.csv",
+            "minuteSleep_merged.csv": folder / "minuteSleep_merged.csv",
+            "heartrate_seconds_merged.csv": folder / "heartrate_seconds_merged.csv",
+            "weightLogInfo_merged.csv": folder / "weightLogInfo_merged.csv",
+        }
+
+        # As in the real export, only the later period has daily sleep summaries
+        if period > 0:
+            files["sleepDay_merged.csv"] = folder / "sleepDay_merged.csv"
+
+        for batch_start in range(0, n_users, batch_size):
+            user_index = np.arange(batch_start, min(batch_start + batch_size, n_users))
+            traits = generate_user_traits(user_index, seed)
+            rng = np.random.default_rng([seed, batch_start, period + 1])
+
+            minute_sleep = generate_minute_sleep(traits, days, rng)
+            frames = {
+                "dailyActivity_merged.csv": generate_daily_activity(traits, days, rng),
+                "minuteSleep_merged.csv": minute_sleep.drop(columns="_night_day"),
+                "heartrate_seconds_merged.csv": generate_heartrate_seconds(traits, days, heartrate_samples_per_day, rng),
+                "weightLogInfo_merged.csv": generate_weight_log(traits, days, rng),
+            }
+
+            if "sleepDay_merged.csv" in files:
+                frames["sleepDay_merged.csv"] = summarize_sleep_days(minute_sleep, days)
+
+            for file_name, df in frames.items():
+                df.to_csv(files[file_name], mode="w" if batch_start == 0 else "a",
+                          header=batch_start == 0, index=False)
+
+        logging.info("Wrote %d users x %d days to %s", n_users, n_days, folder)
+        written.extend(files.values())
+
+    return written
+
+def main() -> None:
+    """Parses command-line arguments and writes a synthetic dataset."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output_dir", type=Path, help="Directory to write the period folders to.")
+    parser.add_argument("--users", type=int, default=1_000, help="Number of users.")
+    parser.add_argument("--days", type=int, default=31, help="Days in each export period.")
+    parser.add_argument("--periods", type=int, default=DEFAULT_PERIODS, help="Number of consecutive export periods.")
+    parser.add_argument("--start-date", type=pd.Timestamp, default=START_DATE, help="First day of the first period.")
+    parser.add_argument("--heartrate-samples", type=int, default=1440,
+                        help="Heart rate readings per tracking user per day.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Users generated at a time.")
+    args = parser.parse_args()
+
+    write_synthetic_dataset(args.output_dir, args.users, args.days, args.heartrate_samples, args.seed, args.batch_size,
+                            args.periods, args.start_date)
+
+if __name__ == "__main__":
+    main()